@@ -1,18 +1,19 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.messaging.publisher import publish_event
 
-from app.core.security import authenticate_user, create_access_token
+from app.core.config import settings
+from app.core.security import authenticate_user, create_access_token, jwks
 from app.db.session import get_db
 from app.schemas.token import Token
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -21,9 +22,18 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
         )
 
     access_token_expires = timedelta(minutes=60)
-    access_token = create_access_token(data={"sub": user.email}, expires_delta=access_token_expires)
+    expires_at = datetime.now(timezone.utc) + access_token_expires
+    # uid: los demás servicios identifican al usuario sin consultar a auth
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires)
 
-    # Publicamos el evento en RabbitMQ
-    publish_event('UserLoggedIn', {'email': user.email, "token": access_token})
+    # Publicamos el evento en RabbitMQ (se encola; lo envía el hilo publicador)
+    publish_event('UserLoggedIn', {'email': user.email, "token": access_token, "expires_at": int(expires_at.timestamp())})
     
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.get("/jwks")
+def get_jwks(response: Response):
+    """ Claves públicas con las que los demás servicios verifican los tokens localmente """
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_MAX_AGE}"
+    return jwks()
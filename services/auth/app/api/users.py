@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status 
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
-from app.core.security import get_password_hash, get_current_user
+from app.core.hashing import password_hasher
+from app.core.security import get_current_user
 from app.db.models import User 
 from app.db.session import get_db
 from app.schemas.user import UserCreate, UserRead
@@ -10,10 +12,10 @@ from app.schemas.user import UserCreate, UserRead
 router = APIRouter()
 
 @router.post("/", response_model=UserRead)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     
     statement = select(User).where(User.email == user.email)
-    db_user = db.exec(statement).first()
+    db_user = (await db.exec(statement)).first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -21,7 +23,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         )
 
     statement = select(User).where(User.username == user.username)
-    db_user = db.exec(statement).first()
+    db_user = (await db.exec(statement)).first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,15 +31,15 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Ahora si creamos el usuario
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(email=user.email, username=user.username, password=hashed_password)
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
 @router.get("/me", response_model=UserRead)
-def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
\ No newline at end of file
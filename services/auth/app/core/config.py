@@ -1,5 +1,6 @@
 import os 
 from pydantic_settings import BaseSettings
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,8 +11,41 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+
+    # Con una clave RSA privada (PEM) los tokens se firman con RS256 y los demás servicios
+    # los verifican con las claves públicas de /auth/jwks; sin ella se usa HS256 con SECRET_KEY
+    JWT_PRIVATE_KEY_FILE: Optional[str] = os.getenv("JWT_PRIVATE_KEY_FILE")
+    JWT_KEY_ID: str = "auth-1"
+    # Claves públicas anteriores que se siguen publicando durante una rotación ({kid: ruta PEM})
+    JWT_RETIRED_PUBLIC_KEY_FILES: Dict[str, str] = {}
+    JWKS_MAX_AGE: int = 300 # segundos de caché de /auth/jwks para los clientes
+
+    # Caché token -> usuario de /users/me
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: float = 60.0 # segundos; nunca más allá del exp del token
+
+    # Pool dedicado para bcrypt: hilos, peticiones en cola y Retry-After de los 503
+    HASHING_WORKERS: int = 4
+    HASHING_MAX_QUEUE: int = 32
+    HASHING_RETRY_AFTER: int = 1
+
+    # Publicación de auth_events: buffer en memoria y un tx_commit por lote
+    RABBITMQ_HOST: str = os.getenv("RABBITMQ_HOST", "localhost")
+    RABBITMQ_PORT: int = 5672
+    AUTH_EVENTS_BUFFER_SIZE: int = 10000
+    AUTH_EVENTS_BATCH_SIZE: int = 100
+    AUTH_EVENTS_BATCH_WAIT: float = 0.05 # segundos que se esperan más eventos para el lote
+    AUTH_EVENTS_RETRY_DELAY: float = 5.0
     DATABASE_URI: str = os.getenv("DATABASE_URI")
 
+    # Pool de conexiones a la base de datos
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800 # segundos
+    DB_STATEMENT_TIMEOUT_MS: int = 15000 # 0 para desactivarlo
+    DB_ECHO: bool = True
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Tiempo de hashing acumulado por la petición en curso (lo inicializa el middleware de main)
+request_hashing_time: ContextVar[Optional[List[float]]] = ContextVar("request_hashing_time", default=None)
+
+
+class HashingSaturated(Exception):
+    """ El pool de bcrypt y su cola están llenos """
+
+
+class LatencyStats:
+    """ Latencias recientes (ventana de `size` muestras) para percentiles aproximados """
+
+    def __init__(self, size: int = 1024):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def stats(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def percentile(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+
+class PasswordHasher:
+    """ Ejecuta bcrypt en un pool de hilos propio y acotado.
+
+    bcrypt tarda ~250 ms por llamada a propósito; en el threadpool compartido de
+    Starlette una ráfaga de logins dejaría sin hilos al resto de rutas. Como mucho hay
+    `workers` cálculos en curso y `max_queue` esperando; por encima se rechaza al
+    momento con HashingSaturated (503) en vez de acumular esperas.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.rejected = 0
+        self.latency = {"hash": LatencyStats(), "verify": LatencyStats(), "queue_wait": LatencyStats()}
+        self.requests: Dict[str, Dict[str, LatencyStats]] = {}
+
+    async def _run(self, operation: str, function, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HashingSaturated()
+
+        def timed():
+            started = time.perf_counter()
+            return function(*args), started, time.perf_counter()
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+
+        self.latency["queue_wait"].record(started - submitted)
+        self.latency[operation].record(finished - started)
+        spent = request_hashing_time.get()
+        if spent is not None:
+            spent.append(finished - submitted)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", pwd_context.verify, plain_password, hashed_password)
+
+    def record_request(self, route: str, hashing: float, other: float):
+        """ Separa el tiempo de una petición en hashing (incluida la cola) y el resto """
+        latency = self.requests.setdefault(route, {"hashing": LatencyStats(), "other": LatencyStats()})
+        latency["hashing"].record(hashing)
+        latency["other"].record(other)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "rejected": self.rejected,
+            **{name: latency.stats() for name, latency in self.latency.items()},
+            "requests": {
+                route: {name: latency.stats() for name, latency in parts.items()}
+                for route, parts in self.requests.items()
+            },
+        }
+
+
+password_hasher = PasswordHasher(settings.HASHING_WORKERS, settings.HASHING_MAX_QUEUE)
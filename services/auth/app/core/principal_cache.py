@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.models import User
+
+
+class PrincipalCache:
+    """ Caché LRU con TTL de token -> usuario para get_current_user.
+
+    Una entrada nunca vive más que el propio token (claim exp), así que un acierto
+    evita tanto la verificación del JWT como la consulta a la tabla users. Los
+    cambios de un usuario invalidan todas sus entradas (ver listeners abajo).
+    Se usa desde el event loop; no es thread-safe.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[Hashable, Set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self._data.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.time():
+            self._remove(token)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def set(self, token: str, user: User, token_expires_at: Optional[float] = None):
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        self._data[token] = (expires_at, user)
+        self._data.move_to_end(token)
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def _remove(self, token: str):
+        _, user = self._data.pop(token)
+        tokens = self._tokens_by_user.get(user.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user.id]
+
+    def invalidate_user(self, user_id: Hashable):
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self._remove(token)
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._data)
+        self._data.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "users": len(self._tokens_by_user),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
+
+
+# Cualquier cambio o baja de un usuario (p. ej. desactivarlo) invalida sus tokens cacheados
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_user(mapper, connection, target: User):
+    principal_cache.invalidate_user(target.id)
@@ -3,29 +3,54 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlmodel import Session, select
+from jose import JWTError, jwk, jwt
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.principal_cache import principal_cache
 from app.db.models import User 
 from app.db.session import get_db
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+RSA_ALGORITHM = "RS256"
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
-    
-def authenticate_user(db: Session, username: str, password: str):
+
+def _read(path: str) -> str:
+    with open(path) as key_file:
+        return key_file.read()
+
+
+# Clave de firma RS256 (None: se firma con HS256 y SECRET_KEY)
+PRIVATE_KEY = _read(settings.JWT_PRIVATE_KEY_FILE) if settings.JWT_PRIVATE_KEY_FILE else None
+
+# Claves públicas por kid: la actual y las retiradas que aún pueden verificar tokens vigentes
+PUBLIC_KEYS = {
+    kid: jwk.construct(_read(path), RSA_ALGORITHM).public_key()
+    for kid, path in settings.JWT_RETIRED_PUBLIC_KEY_FILES.items()
+}
+if PRIVATE_KEY:
+    PUBLIC_KEYS[settings.JWT_KEY_ID] = jwk.construct(PRIVATE_KEY, RSA_ALGORITHM).public_key()
+
+
+def jwks() -> dict:
+    """ JSON Web Key Set con las claves públicas para verificar los tokens """
+    return {
+        "keys": [
+            {**key.to_dict(), "kid": kid, "use": "sig"}
+            for kid, key in PUBLIC_KEYS.items()
+        ]
+    }
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     statement = select(User).where(User.username == username)
-    user = db.exec(statement=statement).first()
+    user = (await db.exec(statement=statement)).first()
     if not user:
         return False
-    if not verify_password(password, user.password):
+    # bcrypt es lento a propósito: en su propio pool, fuera del event loop
+    if not await password_hasher.verify(password, user.password):
         return False 
     return user
 
@@ -37,10 +62,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
 
+    if PRIVATE_KEY:
+        return jwt.encode(to_encode, PRIVATE_KEY, algorithm=RSA_ALGORITHM, headers={"kid": settings.JWT_KEY_ID})
+
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def decode_access_token(token: str) -> dict:
+    """ Valida firma y expiración; la clave depende del algoritmo de la cabecera """
+    header = jwt.get_unverified_header(token)
+    if header.get("alg") == RSA_ALGORITHM:
+        key = PUBLIC_KEYS.get(header.get("kid"))
+        if key is None:
+            raise JWTError("Unknown key id")
+        return jwt.decode(token, key, algorithms=[RSA_ALGORITHM])
+
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,8 +87,13 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    # Token ya verificado y aún vigente: ni JWT ni consulta a la base de datos
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -57,7 +101,15 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
 
     statement = select(User).where(User.email == email)
-    user = db.exec(statement).first()
+    user = (await db.exec(statement)).first()
     if user is None:
         raise credentials_exception
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal_cache.set(token, user, payload.get("exp"))
     return user
\ No newline at end of file
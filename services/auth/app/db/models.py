@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field
 from typing import Optional 
-from datetime import datetime, timezone
+from datetime import datetime
+from app.core.timestamps import utcnow
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
@@ -9,5 +10,5 @@ class User(SQLModel, table=True):
     password: str = Field(..., nullable=False)
     is_active: bool = Field(default=True)
     is_superuser: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.now)})
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": utcnow})
@@ -1,16 +1,28 @@
 import uvicorn
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel, Session
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import time
 
 from app.api import auth, users
 from app.core.config import settings
-from app.db.session import get_db, engine
+from app.core.principal_cache import principal_cache
+from app.core.hashing import password_hasher, request_hashing_time, HashingSaturated
+from app.messaging.publisher import publisher
+from app.db.session import create_db_and_tables, engine
 
-# Creamos las tablas en la base de datos automáticamente
-SQLModel.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Creamos las tablas en la base de datos automáticamente
+    await create_db_and_tables()
+    publisher.start()
+    yield
+    publisher.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
 
-app = FastAPI(title="WWE Rankings Auth Service", description="Servicio de autenticación para la plataforma de rankings de WWE", version="0.1.0")
+app = FastAPI(title="WWE Rankings Auth Service", description="Servicio de autenticación para la plataforma de rankings de WWE", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
@@ -22,5 +34,47 @@ app.include_router(users.router, prefix="/users", tags=["users"])
 def health_check():
     return {"status": "healthy", "service": "auth"}
 
+@app.get("/health/principal-cache")
+async def principal_cache_stats():
+    return principal_cache.stats()
+
+@app.get("/health/hashing")
+async def hashing_stats():
+    return password_hasher.stats()
+
+@app.get("/health/publisher")
+async def publisher_stats():
+    return publisher.stats()
+
+
+# Rutas que calculan bcrypt: su latencia se mide separando hashing y resto de la petición
+HASHING_ROUTES = {("POST", "/auth/login"), ("POST", "/users/")}
+
+@app.middleware("http")
+async def hashing_metrics(request, call_next):
+    if (request.method, request.url.path) not in HASHING_ROUTES:
+        return await call_next(request)
+
+    spent = []
+    context_token = request_hashing_time.set(spent)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_hashing_time.reset(context_token)
+
+    hashing = sum(spent, 0.0)
+    password_hasher.record_request(request.url.path, hashing, time.perf_counter() - started - hashing)
+    return response
+
+@app.exception_handler(HashingSaturated)
+async def hashing_saturated_handler(request, exc):
+    # Rechazo inmediato: mejor que el cliente reintente a que espere detrás de la cola
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many concurrent password operations, retry later"},
+        headers={"Retry-After": str(settings.HASHING_RETRY_AFTER)}
+    )
+
 if __name__ == '__main__':
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,20 +1,163 @@
-import json 
-from pika import BlockingConnection, ConnectionParameters
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
 
-def publish_event(event_name, data):
+from pika import BasicProperties, BlockingConnection, ConnectionParameters
+from pika.exceptions import AMQPError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+AUTH_EVENTS_QUEUE = 'auth_events'
+
+
+class EventPublisher:
+    """ Publicador de larga vida para auth_events.
+
+    Las peticiones solo encolan el evento en memoria (publish no bloquea ni falla);
+    un hilo mantiene la conexión con RabbitMQ, publica cada lote en una transacción
+    AMQP (una sola espera al broker por lote) y reconecta si el broker se cae. El lote
+    sale de pendientes solo tras tx_commit, así que tras una reconexión se reintenta.
+    Si el buffer se llena durante una caída larga, los eventos nuevos se descartan.
+    """
+
+    def __init__(self, queue_name: str, buffer_size: int, batch_size: int, batch_wait: float, retry_delay: float):
+        self.queue_name = queue_name
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retry_delay = retry_delay
+        self._buffer: "queue.Queue[str]" = queue.Queue(maxsize=buffer_size)
+        self._pending: "deque[str]" = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.connected = False
+        self.published = 0
+        self.dropped = 0
+        self.batches = 0
+        self.connection_errors = 0
 
-    connection = BlockingConnection(ConnectionParameters(host='localhost', port=5672))
-    channel = connection.channel()
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="auth-events-publisher", daemon=True)
+        self._thread.start()
 
-    # Declaramos la cola
-    channel.queue_declare(queue='auth_events')
+    def stop(self, timeout: float = 5.0):
+        """ Intenta vaciar el buffer antes de cerrar la conexión """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
 
-    event = {
-        "event_name" : event_name,
-        "data": data
-    }
+    def publish(self, event_name: str, data: dict) -> bool:
+        event = {
+            "event_name": event_name,
+            "data": data
+        }
+        try:
+            self._buffer.put_nowait(json.dumps(event, default=str))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Auth events buffer full, dropping %s", event_name)
+            return False
 
-    channel.basic_publish(exchange='', routing_key='auth_events', body=json.dumps(event))
+    def _run(self):
+        while not (self._stop.is_set() and self._idle()):
+            try:
+                self._serve()
+            except AMQPError:
+                self.connection_errors += 1
+                logger.warning("RabbitMQ unavailable, retrying in %ss", self.retry_delay)
+            except Exception:
+                # El hilo no debe morir: los eventos seguirían acumulándose sin publicarse
+                self.connection_errors += 1
+                logger.exception("Unexpected error publishing auth events")
+            if self._stop.wait(self.retry_delay):
+                return
 
-    connection.close()
+    def _idle(self) -> bool:
+        return not self._pending and self._buffer.empty()
 
+    def _serve(self):
+        connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
+        try:
+            channel = connection.channel()
+            # Transacción en vez de publisher confirms: con confirm_delivery el
+            # BlockingChannel espera el ack de cada mensaje y el lote no ahorraría nada
+            channel.tx_select()
+            channel.queue_declare(queue=self.queue_name)
+            self.connected = True
+
+            while not (self._stop.is_set() and self._idle()):
+                self._fill_batch(connection)
+                if not self._pending:
+                    continue
+                for body in self._pending:
+                    channel.basic_publish(
+                        exchange='',
+                        routing_key=self.queue_name,
+                        body=body,
+                        properties=BasicProperties(content_type='application/json')
+                    )
+                # El broker acepta el lote entero o nada: si la conexión cae antes, se reenvía
+                channel.tx_commit()
+                self.published += len(self._pending)
+                self.batches += 1
+                self._pending.clear()
+        finally:
+            self.connected = False
+            if connection.is_open:
+                connection.close()
+
+    def _fill_batch(self, connection: BlockingConnection):
+        """ Espera al primer evento y junta los que lleguen en batch_wait, hasta batch_size """
+        while not self._pending:
+            stopping = self._stop.is_set()
+            try:
+                self._pending.append(self._buffer.get_nowait() if stopping else self._buffer.get(timeout=0.5))
+            except queue.Empty:
+                if stopping:
+                    return
+                # Mantiene vivos los heartbeats mientras no hay nada que publicar
+                connection.process_data_events(time_limit=0)
+
+        deadline = time.monotonic() + self.batch_wait
+        while len(self._pending) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                self._pending.append(self._buffer.get(timeout=remaining) if remaining > 0 else self._buffer.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "buffered": self._buffer.qsize(),
+            "pending": len(self._pending),
+            "published": self.published,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "connection_errors": self.connection_errors,
+        }
+
+
+publisher = EventPublisher(
+    AUTH_EVENTS_QUEUE,
+    buffer_size=settings.AUTH_EVENTS_BUFFER_SIZE,
+    batch_size=settings.AUTH_EVENTS_BATCH_SIZE,
+    batch_wait=settings.AUTH_EVENTS_BATCH_WAIT,
+    retry_delay=settings.AUTH_EVENTS_RETRY_DELAY
+)
+
+
+def publish_event(event_name, data):
+    """ Encola el evento para el hilo publicador; nunca bloquea la petición """
+    return publisher.publish(event_name, data)
@@ -1,39 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, desc
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import Integer, cast, func, or_
+from sqlmodel import select, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from datetime import datetime
+import asyncio
+import httpx
 
 from app.db.models import Venue, Event, EventType
-from app.db.session import get_db
-from app.schemas.event import EventCreate, EventRead, EventDetail, EventUpdate, VenueCreate, VenueRead
+from app.db.session import engine, get_db
+from app.core.conditional import Validators, page_validators, probe_page
+from app.core.export import export_query, ndjson_response
+from app.core.config import settings
+from app.core.fast_json import read_columns, rows_response
+from app.core.http_client import http_client
+from app.core.pagination import Keyset, fetch_rows, paginate
+from app.core.timestamps import UtcDateTime
+from app.schemas.event import EventCreate, EventRead, EventDetail, EventCard, EventUpdate, VenueCreate, VenueRead
 
 router = APIRouter()
 
+async def get_event_matches(event_id: int) -> Optional[dict]:
+    """ Luchas del evento con luchadores y ratings desde el servicio matches (None si no responde) """
+    try:
+        response = await http_client.get("matches", f"/matches/events/{event_id}")
+        if response.status_code == 200:
+            return response.json()
+        return None
+    except httpx.RequestError:
+        return None
+
+VENUES_KEYSET = Keyset(Venue.id)
+EVENTS_KEYSET = Keyset(Event.date, Event.id, descending=True)
+# Versión de cada fila para los ETag de los listados
+VENUE_VERSION_COLUMNS = (Venue.id, Venue.created_at, Venue.updated_at)
+EVENT_VERSION_COLUMNS = (Event.id, Event.created_at, Event.updated_at)
+# Listados con ?fast=true: filas con las columnas de VenueRead/EventRead, en su orden.
+# attendance es texto en la tabla y entero en el esquema
+VENUE_READ_FIELDS, VENUE_READ_COLUMNS = read_columns(VenueRead, Venue)
+EVENT_READ_FIELDS, EVENT_READ_COLUMNS = read_columns(EventRead, Event, attendance=cast(Event.attendance, Integer).label("attendance"))
+
 @router.post("/venues/", response_model=VenueRead)
-def create_venue(venue: VenueCreate, db: Session = Depends(get_db)):
+async def create_venue(venue: VenueCreate, db: AsyncSession = Depends(get_db)):
     
     db_venue = Venue(**venue.model_dump(exclude_unset=True))
     db.add(db_venue)
-    db.commit()
-    db.refresh(db_venue)
+    await db.commit()
+    await db.refresh(db_venue)
     return db_venue
 
 @router.get("/venues/", response_model=List[VenueRead])
-def get_venues(skip: int = 0, limit: int = 100, country: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_venues(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    country: Optional[str] = None,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
 
     query = select(Venue)
     if country:
         query = query.where(Venue.country == country)
 
-    statement = query.offset(skip).limit(limit)
-    venues = db.exec(statement).all()
+    not_modified = await probe_page(db, request, query, VENUES_KEYSET, "venues", VENUE_VERSION_COLUMNS, limit, skip=skip, cursor=cursor)
+    if not_modified is not None:
+        return not_modified
+
+    if fast:
+        rows = await paginate(db, query, VENUES_KEYSET, response, limit, skip=skip, cursor=cursor, columns=VENUE_READ_COLUMNS)
+        page_validators("venues", rows, VENUE_VERSION_COLUMNS, response).apply(response)
+        return rows_response(rows, VENUE_READ_FIELDS, response)
+
+    venues = await paginate(db, query, VENUES_KEYSET, response, limit, skip=skip, cursor=cursor)
+    page_validators("venues", venues, VENUE_VERSION_COLUMNS, response).apply(response)
 
     return [VenueRead.model_validate(venue) for venue in venues]
 
+@router.get("/venues/export")
+async def export_venues(
+    updated_since: Optional[UtcDateTime] = None,
+    after_id: Optional[int] = None,
+    country: Optional[str] = None
+):
+    """ Todos los venues (campos de VenueRead) en NDJSON, una línea por venue """
+
+    query = select(Venue).with_only_columns(*VENUE_READ_COLUMNS)
+    if country:
+        query = query.where(Venue.country == country)
+
+    return await ndjson_response(export_query(query, Venue, updated_since, after_id), VENUE_READ_FIELDS)
+
 @router.get("/venues/{venue_id}", response_model=VenueRead)
-def get_venue(venue_id: int , db: Session = Depends(get_db)): 
+async def get_venue(venue_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)): 
     
-    venue = db.get(Venue, venue_id)
+    statement = select(Venue.created_at, Venue.updated_at).where(Venue.id == venue_id)
+    version = (await db.exec(statement)).first()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Venue not found"
+        )
+
+    validators = Validators.for_item("venue", venue_id, *version)
+    if validators.matches(request):
+        return validators.not_modified()
+    validators.apply(response)
+
+    venue = await db.get(Venue, venue_id)
     
     if not venue:
         raise HTTPException(
@@ -45,10 +121,10 @@ def get_venue(venue_id: int , db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=EventRead, status_code=status.HTTP_201_CREATED)
-def create_event(event: EventCreate, db: Session = Depends(get_db)):
+async def create_event(event: EventCreate, db: AsyncSession = Depends(get_db)):
     
     if event.venue_id:
-        venue = db.get(Venue, event.venue_id)
+        venue = await db.get(Venue, event.venue_id)
         if not venue:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -57,45 +133,102 @@ def create_event(event: EventCreate, db: Session = Depends(get_db)):
 
     db_event = Event(**event.model_dump(exclude_unset=True))
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.commit()
+    await db.refresh(db_event)
     return EventRead.model_validate(db_event)
 
 @router.get("/", response_model=List[EventRead], status_code=status.HTTP_200_OK)
-def get_events(
+async def get_events(
+    request: Request,
+    response: Response,
     skip: int = 0, 
-    limit: int = 0, 
+    limit: int = 100, 
+    cursor: Optional[str] = None,
     event_type: Optional[EventType] = None, 
-    year: Optional[int] = None, 
-    name: Optional[str] = None, 
-    from_date: Optional[datetime] = None,
-    to_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    name: Optional[str] = Query(None, min_length=1), 
+    from_date: Optional[UtcDateTime] = None,
+    to_date: Optional[UtcDateTime] = None,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     
     query = select(Event)
     if event_type:
         query = query.where(Event.event_type == event_type)
     if year:
-        query = query.where(db.func.year(Event.date) == year)
-    if name:
-        query = query.where(Event.name.ilike(f"%{name}%"))
+        # Rango sobre la columna (no una función de ella) para que use ix_events_date_id
+        query = query.where(Event.date >= datetime(year, 1, 1), Event.date < datetime(year + 1, 1, 1))
     if from_date:
         query = query.where(Event.date >= from_date)
     if to_date:
         query = query.where(Event.date <= to_date)
 
-    query = query.order_by(Event.date.desc())
-    statement = query.offset(skip).limit(limit)
-    events = db.exec(statement).all()
+    if name and engine.dialect.name == "postgresql":
+        # ILIKE y el operador % (similitud) usan el índice de trigramas ix_events_name_trgm;
+        # los resultados van por relevancia, así que se pagina con skip y no por cursor
+        relevance = func.similarity(Event.name, name)
+        query = query.where(or_(Event.name.ilike(f"%{name}%"), Event.name.op("%")(name)))
+        query = query.order_by(relevance.desc(), Event.date.desc(), Event.id.desc()).offset(skip).limit(limit)
+        if fast:
+            return rows_response(await fetch_rows(db, query.with_only_columns(*EVENT_READ_COLUMNS)), EVENT_READ_FIELDS, response)
+        events = (await db.exec(query)).all()
+        return [EventRead.model_validate(event) for event in events]
+    if name:
+        query = query.where(Event.name.ilike(f"%{name}%"))
+
+    not_modified = await probe_page(db, request, query, EVENTS_KEYSET, "events", EVENT_VERSION_COLUMNS, limit, skip=skip, cursor=cursor)
+    if not_modified is not None:
+        return not_modified
+
+    # Más recientes primero; con `cursor` se ignora `skip`
+    if fast:
+        rows = await paginate(db, query, EVENTS_KEYSET, response, limit, skip=skip, cursor=cursor, columns=EVENT_READ_COLUMNS)
+        page_validators("events", rows, EVENT_VERSION_COLUMNS, response).apply(response)
+        return rows_response(rows, EVENT_READ_FIELDS, response)
+
+    events = await paginate(db, query, EVENTS_KEYSET, response, limit, skip=skip, cursor=cursor)
+    page_validators("events", events, EVENT_VERSION_COLUMNS, response).apply(response)
 
     return [EventRead.model_validate(event) for event in events]
     
+@router.get("/export")
+async def export_events(
+    updated_since: Optional[UtcDateTime] = None,
+    after_id: Optional[int] = None,
+    event_type: Optional[EventType] = None
+):
+    """ Todos los eventos (campos de EventRead) en NDJSON, una línea por evento """
+
+    query = select(Event).with_only_columns(*EVENT_READ_COLUMNS)
+    if event_type:
+        query = query.where(Event.event_type == event_type)
+
+    return await ndjson_response(export_query(query, Event, updated_since, after_id), EVENT_READ_FIELDS)
+    
 @router.get("/{event_id}", response_model=EventDetail)
-def get_event(event_id: int, db: Session = Depends(get_db)):
+async def get_event(event_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     
+    # Versión del evento y de su venue, sin cargar las filas
+    statement = (
+        select(Event.created_at, Event.updated_at, Venue.created_at, Venue.updated_at)
+        .outerjoin(Venue, Venue.id == Event.venue_id)
+        .where(Event.id == event_id)
+    )
+    version = (await db.exec(statement)).first()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+    validators = Validators.for_item("event", event_id, *version)
+    if validators.matches(request):
+        return validators.not_modified()
+    validators.apply(response)
+
     statement = select(Event).where(Event.id == event_id)
-    event = db.exec(statement).first()
+    event = (await db.exec(statement)).first()
 
     if not event:
         raise HTTPException(
@@ -107,7 +240,7 @@ def get_event(event_id: int, db: Session = Depends(get_db)):
     venue = None
     if event.venue_id:
         statement = select(Venue).where(Venue.id == event.venue_id)
-        venue = db.exec(statement).first()
+        venue = (await db.exec(statement)).first()
 
     # Creamos el objeto de respuesta 
     event_detail = {
@@ -116,4 +249,42 @@ def get_event(event_id: int, db: Session = Depends(get_db)):
     }
     
     return event_detail
+
+@router.get("/{event_id}/card", response_model=EventCard)
+async def get_event_card(event_id: int, db: AsyncSession = Depends(get_db)):
+    
+    # Pedimos las luchas a matches mientras consultamos el evento y el venue
+    matches_task = asyncio.create_task(asyncio.wait_for(get_event_matches(event_id), settings.EVENT_CARD_DEADLINE))
+    try:
+        event = await db.get(Event, event_id)
+        venue = await db.get(Venue, event.venue_id) if event and event.venue_id else None
+    except BaseException:
+        matches_task.cancel()
+        raise
+
+    if not event:
+        matches_task.cancel()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+    try:
+        card = await matches_task
+    except asyncio.TimeoutError:
+        card = None
+
+    if card is None:
+        # La página se puede pintar sin luchas: avisamos de que falta esa parte
+        matches, partial, unavailable = [], True, ["matches"]
+    else:
+        matches, partial, unavailable = card["matches"], card["partial"], card["unavailable"]
+
+    return {
+        **event.__dict__,
+        "venue": venue.__dict__ if venue else None,
+        "matches": matches,
+        "partial": partial,
+        "unavailable": unavailable
+    }
     
\ No newline at end of file
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, desc
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlmodel import select, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from datetime import datetime 
 
 from app.db.models import Show, ShowType, Venue 
 from app.db.session import get_db
+from app.core.conditional import Validators, page_validators, probe_page
+from app.core.export import export_query, ndjson_response
+from app.core.fast_json import read_columns, rows_response
+from app.core.pagination import Keyset, paginate
+from app.core.timestamps import UtcDateTime
 from app.schemas.show import ShowCreate, ShowRead, ShowDetail, ShowUpdate
 
 router = APIRouter() 
 
+SHOWS_KEYSET = Keyset(Show.date, Show.id, descending=True)
+# Versión de cada fila para los ETag del listado
+SHOW_VERSION_COLUMNS = (Show.id, Show.created_at, Show.updated_at)
+# Listado con ?fast=true: filas con las columnas de ShowRead, en su orden
+SHOW_READ_FIELDS, SHOW_READ_COLUMNS = read_columns(ShowRead, Show)
+
 @router.post("/", response_model=ShowCreate, status_code=status.HTTP_201_CREATED)
-def create_show(show: ShowCreate, db: Session = Depends(get_db)):
+async def create_show(show: ShowCreate, db: AsyncSession = Depends(get_db)):
 
     # verificamos que el venue si existe
     if show.venue_id:
-        venue = db.get(Venue, show.venue_id)
+        venue = await db.get(Venue, show.venue_id)
         if not venue:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -23,29 +35,34 @@ def create_show(show: ShowCreate, db: Session = Depends(get_db)):
 
     db_show = Show(**show.model_dump(exclude_unset=True))
     db.add(db_show)
-    db.commit()
-    db.refresh(db_show)
+    await db.commit()
+    await db.refresh(db_show)
 
     return db_show
 
 
 @router.get("/", response_model=List[ShowRead])
-def get_shows(
+async def get_shows(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     show_type: Optional[ShowType] = None,
-    year: Optional[int] = None,
-    from_date: Optional[datetime] = None,
-    to_date: Optional[datetime] = None,
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    from_date: Optional[UtcDateTime] = None,
+    to_date: Optional[UtcDateTime] = None,
     is_live: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    fast: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     query = select(Show)
 
     if show_type:
         query = query.where(Show.show_type == show_type)
     if year:
-        query = query.where(Show.date.year == year)
+        # Rango sobre la columna para que use los índices por fecha (ix_shows_type_date_id con show_type)
+        query = query.where(Show.date >= datetime(year, 1, 1), Show.date < datetime(year + 1, 1, 1))
     if from_date:
         query = query.where(Show.date >= from_date)
     if to_date:
@@ -53,25 +70,66 @@ def get_shows(
     if is_live is not None:
         query = query.where(Show.is_live == is_live)
 
-    # Ordenamos por fecha, más recientes primero
-    query = query.order_by(Show.date.desc())
-    statement = query.offset(skip).limit(limit)
-    shows = db.exec(statement).all()
+    not_modified = await probe_page(db, request, query, SHOWS_KEYSET, "shows", SHOW_VERSION_COLUMNS, limit, skip=skip, cursor=cursor)
+    if not_modified is not None:
+        return not_modified
+
+    # Ordenamos por fecha, más recientes primero; con `cursor` se ignora `skip`
+    if fast:
+        rows = await paginate(db, query, SHOWS_KEYSET, response, limit, skip=skip, cursor=cursor, columns=SHOW_READ_COLUMNS)
+        page_validators("shows", rows, SHOW_VERSION_COLUMNS, response).apply(response)
+        return rows_response(rows, SHOW_READ_FIELDS, response)
+
+    shows = await paginate(db, query, SHOWS_KEYSET, response, limit, skip=skip, cursor=cursor)
+    page_validators("shows", shows, SHOW_VERSION_COLUMNS, response).apply(response)
 
     return [ShowRead.model_validate(s) for s in shows]
 
 
+@router.get("/export")
+async def export_shows(
+    updated_since: Optional[UtcDateTime] = None,
+    after_id: Optional[int] = None,
+    show_type: Optional[ShowType] = None
+):
+    """ Todos los shows (campos de ShowRead) en NDJSON, una línea por show """
+
+    query = select(Show).with_only_columns(*SHOW_READ_COLUMNS)
+    if show_type:
+        query = query.where(Show.show_type == show_type)
+
+    return await ndjson_response(export_query(query, Show, updated_since, after_id), SHOW_READ_FIELDS)
+
+
 @router.get("/{show_id}", response_model=ShowDetail, status_code=status.HTTP_200_OK)
-def get_show(show_id: int, db: Session = Depends(get_db)):
+async def get_show(show_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     
-    show = db.get(Show, show_id)
+    # Versión del show y de su venue, sin cargar las filas
+    statement = (
+        select(Show.created_at, Show.updated_at, Venue.created_at, Venue.updated_at)
+        .outerjoin(Venue, Venue.id == Show.venue_id)
+        .where(Show.id == show_id)
+    )
+    version = (await db.exec(statement)).first()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Show not found"
+        )
+
+    validators = Validators.for_item("show", show_id, *version)
+    if validators.matches(request):
+        return validators.not_modified()
+    validators.apply(response)
+
+    show = await db.get(Show, show_id)
     if not show:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Show not found"
         )
         
-    venue = db.get(Venue, show.venue_id) if show.venue_id else None
+    venue = await db.get(Venue, show.venue_id) if show.venue_id else None
 
     show_detail = ShowDetail(
         **show.model_dump(), 
@@ -82,9 +140,9 @@ def get_show(show_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{show_id}", response_model=ShowRead, status_code=status.HTTP_200_OK)
-def update_show(show_id: int, show_update: ShowUpdate, db: Session = Depends(get_db)):
+async def update_show(show_id: int, show_update: ShowUpdate, db: AsyncSession = Depends(get_db)):
 
-    db_show = db.get(Show, show_id)
+    db_show = await db.get(Show, show_id)
     if not db_show:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,7 +151,7 @@ def update_show(show_id: int, show_update: ShowUpdate, db: Session = Depends(get
 
     # Verificamos que el venue existe si se proporciona 
     if show_update.venue_id:
-        venue = db.get(Venue, show_update.venue_id)
+        venue = await db.get(Venue, show_update.venue_id)
         if not venue:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -104,23 +162,23 @@ def update_show(show_id: int, show_update: ShowUpdate, db: Session = Depends(get
     for key, value in show_update.model_dump(exclude_unset=True).items():
         setattr(db_show, key, value)
 
-    db.commit()
-    db.refresh(db_show)
+    await db.commit()
+    await db.refresh(db_show)
     return db_show
 
     
 @router.delete("/{show_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_show(show_id: int, db: Session = Depends(get_db)):
+async def delete_show(show_id: int, db: AsyncSession = Depends(get_db)):
 
-    db_show = db.get(Show, show_id)
+    db_show = await db.get(Show, show_id)
     if not db_show:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Show not found"
         )
 
-    db.delete(db_show)
-    db.commit()
+    await db.delete(db_show)
+    await db.commit()
     return None
     
         
@@ -1,5 +1,6 @@
 import os 
 from pydantic_settings import BaseSettings
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,6 +10,37 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     DATABASE_URI: str = os.getenv("DATABASE_URI")
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8000")
+    MATCHES_SERVICE_URL: str = os.getenv("MATCHES_SERVICE_URL", "http://matches-service:8002")
+
+    # Pool HTTP compartido para las llamadas entre servicios
+    HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 2.0
+    HTTP_POOL_TIMEOUT: float = 1.0
+    HTTP_MAX_CONNECTIONS_PER_TARGET: int = 50
+    HTTP_MAX_KEEPALIVE_PER_TARGET: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Plazo máximo para las luchas de GET /events/{id}/card (servicio matches)
+    EVENT_CARD_DEADLINE: float = 3.0
+
+    # Descargas NDJSON (/export): filas por lectura del cursor del servidor
+    EXPORT_CHUNK_SIZE: int = 1000
+    EXPORT_STATEMENT_TIMEOUT_MS: int = 0 # sin límite durante una descarga
+
+    # Pool de conexiones a la base de datos
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800 # segundos
+    DB_STATEMENT_TIMEOUT_MS: int = 15000 # 0 para desactivarlo
+    DB_ECHO: bool = False
+
+    # Verificación local de los JWT de auth con sus claves públicas (/auth/jwks)
+    JWT_JWKS_TTL: float = 3600.0
+    JWT_JWKS_MIN_REFRESH: float = 30.0 # segundos entre recargas forzadas por un kid desconocido
+    JWT_JWKS_TIMEOUT: float = 2.0
+    # Secreto compartido con auth para sus tokens HS256 (si auth no firma con RSA)
+    JWT_SECRET_KEY: Optional[str] = os.getenv("JWT_SECRET_KEY")
 
     class Config:
         case_sensitive = True
@@ -1,6 +1,8 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import DDL, Index, event
 from typing import Optional, List 
-from datetime import datetime, timezone
+from datetime import datetime
+from app.core.timestamps import utcnow
 import enum
 
 class EventType(str, enum.Enum):
@@ -27,6 +29,9 @@ class ShowType(str, enum.Enum):
 class Venue(SQLModel, table=True):
 
     __tablename__: str = "venues"
+    __table_args__ = (
+        Index("ix_venues_country_id", "country", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     name: str = Field(nullable=True)
@@ -34,8 +39,8 @@ class Venue(SQLModel, table=True):
     state: Optional[str] = Field(default=None)
     country: str = Field(nullable=False)
     capacity: Optional[int] = Field(default=None)
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
 
     events: List["Event"] = Relationship(back_populates="venue")
     shows: List["Show"] = Relationship(back_populates="venue")
@@ -43,6 +48,16 @@ class Venue(SQLModel, table=True):
 class Event(SQLModel, table=True):
     
     __tablename__: str = "events"
+    __table_args__ = (
+        # Orden de los listados y paginación por cursor: (date, id); también los rangos por año
+        Index("ix_events_date_id", "date", "id"),
+        # Búsqueda por nombre: trigramas (pg_trgm) para ILIKE '%...%' y el orden por similarity()
+        Index(
+            "ix_events_name_trgm", "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     name: str = Field(nullable=False, index=True)
     event_type: EventType = Field(nullable=False)
@@ -51,14 +66,19 @@ class Event(SQLModel, table=True):
     description: Optional[str] = Field(default=None)
     attendance: Optional[str] = Field(default=None)
     image_url: Optional[str] = Field(default=None)
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
 
     venue: Optional["Venue"] = Relationship(back_populates="events")
 
 class Show(SQLModel, table=True):
     
     __tablename__: str = "shows"
+    __table_args__ = (
+        Index("ix_shows_date_id", "date", "id"),
+        # Filtro por tipo de show con rango de fechas, en el mismo orden que el listado
+        Index("ix_shows_type_date_id", "show_type", "date", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     show_type: ShowType = Field(nullable=False)
@@ -68,7 +88,15 @@ class Show(SQLModel, table=True):
     is_live: bool = Field(default=True)
     description: Optional[str] = Field(default=None)
     attendance: Optional[int] = Field(default=None)
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
 
-    venue: Optional["Venue"] = Relationship(back_populates="shows")
\ No newline at end of file
+    venue: Optional["Venue"] = Relationship(back_populates="shows")
+
+
+# El índice de trigramas necesita la extensión pg_trgm
+event.listen(
+    Event.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
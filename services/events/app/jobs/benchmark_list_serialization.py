@@ -0,0 +1,103 @@
+""" Mide el serializado de los listados de venues, events y shows: camino normal frente
+a ?fast=true, en filas por segundo, y comprueba que ambos producen los mismos bytes.
+
+No usa la base de datos: genera filas sintéticas y reproduce el trabajo de cada ruta
+después de la consulta. Normal: model_validate por fila, validación y serializado con
+el response_model de la ruta (serialize_response de FastAPI) y JSONResponse. Rápido:
+las tuplas que devuelve la consulta de columnas, codificadas por rows_response.
+
+Uso: python -m app.jobs.benchmark_list_serialization [--rows 100] [--repeat 200]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api import events, shows
+from app.core.fast_json import rows_response
+from app.db.models import Event, EventType, Show, ShowType, Venue
+from app.schemas.event import EventRead, VenueRead
+from app.schemas.show import ShowRead
+
+
+def sample_rows(rows: int):
+    """ (modelos, tuplas) de cada listado; las tuplas llevan los tipos que da la consulta """
+    base = datetime(1985, 3, 31, 20, 0)
+    venues, events_, shows_ = [], [], []
+    for i in range(1, rows + 1):
+        created_at = base + timedelta(days=i, microseconds=i * 1000)
+        updated_at = created_at + timedelta(hours=1) if i % 3 else None
+        venues.append(Venue(
+            id=i, name=f"Arena {i}", city="São Paulo" if i % 2 else "New York", state=None,
+            country="EEUU", capacity=15000 + i, created_at=created_at, updated_at=updated_at
+        ))
+        events_.append(Event(
+            id=i, name=f"WrestleMania {i}", event_type=EventType.PPV, date=base + timedelta(days=365 * i),
+            venue_id=i, description="The Showcase of the Immortals " * 4, attendance=str(60000 + i),
+            image_url=f"https://img.example.com/events/{i}.jpg", created_at=created_at, updated_at=updated_at
+        ))
+        shows_.append(Show(
+            id=i, show_type=ShowType.RAW, episode_number=i, date=base + timedelta(weeks=i), venue_id=i,
+            is_live=bool(i % 2), description="Monday Night Raw", attendance=12000 + i,
+            created_at=created_at, updated_at=updated_at
+        ))
+
+    def as_tuples(objects, fields, **converters):
+        return [
+            tuple(converters[field](getattr(obj, field)) if field in converters else getattr(obj, field) for field in fields)
+            for obj in objects
+        ]
+
+    return {
+        "venues": (venues, VenueRead, as_tuples(venues, events.VENUE_READ_FIELDS), events.VENUE_READ_FIELDS, events.router, "get_venues"),
+        "events": (events_, EventRead, as_tuples(events_, events.EVENT_READ_FIELDS, attendance=int), events.EVENT_READ_FIELDS, events.router, "get_events"),
+        "shows": (shows_, ShowRead, as_tuples(shows_, shows.SHOW_READ_FIELDS), shows.SHOW_READ_FIELDS, shows.router, "get_shows"),
+    }
+
+
+def route_named(router, name: str):
+    return next(route for route in router.routes if getattr(route, "name", None) == name)
+
+
+async def normal_body(objects, schema, route) -> bytes:
+    content = [schema.model_validate(obj) for obj in objects]
+    value = await serialize_response(field=route.response_field, response_content=content)
+    return JSONResponse(content=value).body
+
+
+def fast_body(rows, fields) -> bytes:
+    response = Response()
+    # Como en FastAPI, la respuesta de las dependencias no lleva content-length
+    del response.headers["content-length"]
+    return rows_response(rows, fields, response).body
+
+
+async def benchmark(rows: int, repeat: int):
+    print(f"{'listado':<8} {'filas':>6} {'normal filas/s':>15} {'fast filas/s':>13} {'x':>6}  bytes iguales")
+    for name, (objects, schema, tuples, fields, router, route_name) in sample_rows(rows).items():
+        route = route_named(router, route_name)
+        same = await normal_body(objects, schema, route) == fast_body(tuples, fields)
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await normal_body(objects, schema, route)
+        normal = rows * repeat / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fast_body(tuples, fields)
+        fast = rows * repeat / (time.perf_counter() - started)
+
+        print(f"{name:<8} {rows:>6} {normal:>15,.0f} {fast:>13,.0f} {fast / normal:>6.1f}  {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="filas por página")
+    parser.add_argument("--repeat", type=int, default=200, help="páginas serializadas por camino")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.rows, args.repeat))
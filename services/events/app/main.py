@@ -3,19 +3,30 @@ from fastapi import FastAPI, Depends ,HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import httpx 
-from sqlmodel import SQLModel, Session 
+from contextlib import asynccontextmanager
 
 from app.api import events, shows
 from app.core.config import settings 
-from app.db.session import engine 
+from app.core.http_client import http_client
+from app.core.jwt_verify import verifier, bearer_token, InvalidToken, KeysUnavailable
+from app.db.session import create_db_and_tables, engine
 
-# Creamos las tablas en la base de datos
-SQLModel.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Creamos las tablas en la base de datos
+    await create_db_and_tables()
+
+    # Un único cliente HTTP con keep-alive para las llamadas a auth y matches
+    http_client.open()
+    yield
+    await http_client.aclose()
+    await engine.dispose()
 
 app = FastAPI(
     title="WWE Rankings Events Service",
     description="Servicio de gestión de eventos para la plataforma de rankings de WWE",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -24,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(events.router, prefix="/events", tags=["events"])
@@ -33,10 +45,18 @@ app.include_router(shows.router, prefix="/shows", tags=["shows"])
 def health_check():
     return {"status": "healthy", "service": "events"}
 
+@app.get("/health/http-pool")
+def http_pool_stats():
+    return http_client.stats()
+
+@app.get("/health/jwks")
+async def jwks_stats():
+    return verifier.stats()
+
     
 @app.middleware("http")
 async def verify_token(request, call_next):
-    if request.url.path == "/health":
+    if request.url.path.startswith("/health"):
         response = await call_next(request)
         return response
 
@@ -51,17 +71,17 @@ async def verify_token(request, call_next):
         response = await call_next(request)
         return response
 
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
+    token = bearer_token(request.headers.get("Authorization"))
+    if not token:
         return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Not authenticated"})
 
-    # Verificamos el token con el servicio de autenticación
+    # Verificamos localmente el token emitido por el servicio de autenticación
     try:
+        request.state.principal = await verifier.verify(token)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.AUTH_SERVICE_URL}/users/me", headers={"Authorization": auth_header})
-
-    except httpx.RequestError:
+    except InvalidToken:
+        return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid token"})
+    except KeysUnavailable:
         return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Auth service unavailable."})
 
     response = await call_next(request)
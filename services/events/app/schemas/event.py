@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
+from app.core.timestamps import UtcDateTime
 from app.db.models import EventType
 
 class VenueBase(BaseModel):
@@ -25,7 +26,7 @@ class EventBase(BaseModel):
 
     name: str 
     event_type: EventType
-    date: datetime 
+    date: UtcDateTime
     venue_id: Optional[int] = None
     description: Optional[str] = None
     attendance: Optional[int] = None
@@ -38,7 +39,7 @@ class EventUpdate(BaseModel):
     
     name: Optional[str] = None
     event_type: Optional[EventType] = None
-    date: Optional[datetime] = None
+    date: Optional[UtcDateTime] = None
     venue_id: Optional[int] = None
     description: Optional[str] = None
     attendance: Optional[str] = None
@@ -55,4 +56,12 @@ class EventRead(EventBase):
 
 
 class EventDetail(EventRead):
-    venue: Optional[VenueRead] = None
\ No newline at end of file
+    venue: Optional[VenueRead] = None
+
+
+class EventCard(EventDetail):
+    # Luchas con sus luchadores y ratings, tal como las devuelve el servicio matches
+    matches: List[Dict[str, Any]] = []
+    # True si matches (o wrestlers, a través de matches) no respondió a tiempo
+    partial: bool = False
+    unavailable: List[str] = []
@@ -1,12 +1,13 @@
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime
+from app.core.timestamps import UtcDateTime
 from app.db.models import ShowType
 
 class ShowBase(BaseModel):
     show_type: ShowType
     episode_number: Optional[int] = None
-    date: datetime 
+    date: UtcDateTime
     venue_id: Optional[int] = None
     is_live: bool = True
     description: Optional[str] = None
@@ -18,7 +19,7 @@ class ShowCreate(ShowBase):
 class ShowUpdate(BaseModel):
     show_type: Optional[ShowType] = None
     episode_number: Optional[int] = None
-    date: Optional[datetime] = None
+    date: Optional[UtcDateTime] = None
     venue_id: Optional[int] = None
     is_live: Optional[bool] = True
     description: Optional[str] = None
@@ -0,0 +1,196 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncIterator, List, Tuple
+import asyncio
+import json
+import logging
+
+from app.api.matches import get_event_info, get_wrestlers_info
+from app.core.config import settings
+from app.core.concurrency import gather_with_deadline, UNAVAILABLE
+from app.core.timestamps import utcnow
+from app.db.models import Match, MatchWrestler
+from app.db.ranking import apply_matches_ranking
+from app.db.rating_summary import new_summary
+from app.db.session import async_session
+from app.messaging.publisher import publish_event, match_created_event
+from app.schemas.match import MatchCreate
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# (número de línea, contenido)
+Line = Tuple[int, bytes]
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """ StreamingResponse que puede seguir leyendo el cuerpo de la petición mientras responde.
+
+    Con ASGI < 2.4 StreamingResponse escucha la desconexión del cliente llamando a
+    receive() en paralelo, y se quedaría con los trozos del cuerpo que el generador
+    necesita. Aquí no hace falta: request.stream() ya detecta la desconexión.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def read_ndjson_chunks(request: Request, size: int) -> AsyncIterator[List[Line]]:
+    """ Agrupa en bloques de `size` las líneas no vacías del cuerpo a medida que llegan """
+    buffer = b""
+    line_number = 0
+    chunk = []
+
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                chunk.append((line_number, line))
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+
+    if buffer.strip():
+        chunk.append((line_number + 1, buffer))
+    if chunk:
+        yield chunk
+
+
+def error(line_number: int, detail: str) -> dict:
+    return {"line": line_number, "status": "error", "detail": detail}
+
+
+def validation_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'line'}: {e['msg']}" for e in exc.errors())
+
+
+async def import_chunk(db: AsyncSession, lines: List[Line]) -> Tuple[List[dict], List[dict]]:
+    """ Valida e inserta un bloque de luchas en una sola transacción.
+
+    Devuelve el resultado de cada línea y los eventos MatchCreated a publicar.
+    """
+    results = {}
+    records = []
+    for line_number, line in lines:
+        try:
+            record = MatchCreate.model_validate_json(line)
+        except ValidationError as exc:
+            results[line_number] = error(line_number, validation_detail(exc))
+            continue
+
+        wrestler_ids = [entry.wrestler_id for entry in record.wrestlers]
+        if len(set(wrestler_ids)) != len(wrestler_ids):
+            results[line_number] = error(line_number, "Duplicated wrestler in match")
+            continue
+        records.append((line_number, record))
+
+    # Cada evento y luchador se consulta una sola vez por bloque (y pasa por la caché)
+    event_ids = list(dict.fromkeys(record.event_id for _, record in records))
+    wrestler_ids = list(dict.fromkeys(entry.wrestler_id for _, record in records for entry in record.wrestlers))
+    (event_results, _), wrestlers_info = await asyncio.gather(
+        gather_with_deadline(
+            [lambda event_id=event_id: get_event_info(event_id) for event_id in event_ids],
+            limit=settings.IMPORT_LOOKUP_CONCURRENCY,
+            deadline=settings.IMPORT_LOOKUP_DEADLINE
+        ),
+        get_wrestlers_info(wrestler_ids)
+    )
+    events = dict(zip(event_ids, event_results))
+
+    valid = []
+    for line_number, record in records:
+        event = events.get(record.event_id)
+        if event is UNAVAILABLE:
+            results[line_number] = error(line_number, "Events service unavailable")
+        elif not event:
+            results[line_number] = error(line_number, "Event not found")
+        elif wrestlers_info is None:
+            results[line_number] = error(line_number, "Wrestlers service unavailable")
+        else:
+            missing = [entry.wrestler_id for entry in record.wrestlers if entry.wrestler_id not in wrestlers_info[0]]
+            if missing:
+                results[line_number] = error(line_number, f"Wrestler with ID {', '.join(map(str, missing))} not found")
+            else:
+                valid.append((line_number, record))
+
+    published = []
+    if valid:
+        now = utcnow()
+        matches = [Match(**record.model_dump(exclude={"wrestlers"}), created_at=now) for _, record in valid]
+
+        try:
+            # INSERT de varias filas con RETURNING, en el mismo orden que los parámetros
+            statement = insert(Match).returning(Match.id, sort_by_parameter_order=True)
+            result = await db.exec(statement, params=[match.model_dump(exclude={"id"}) for match in matches])
+            match_ids = result.scalars().all()
+
+            participants = []
+            wrestler_rows = []
+            for match, match_id, (_, record) in zip(matches, match_ids, valid):
+                match.id = match_id
+                entries = [(entry.wrestler_id, entry.is_winner, entry.team) for entry in record.wrestlers]
+                participants.append((match, entries))
+                wrestler_rows.extend(
+                    {"match_id": match_id, "wrestler_id": wrestler_id, "is_winner": is_winner, "team": team}
+                    for wrestler_id, is_winner, team in entries
+                )
+
+            if wrestler_rows:
+                await db.exec(insert(MatchWrestler), params=wrestler_rows)
+            db.add_all([new_summary(match) for match in matches])
+            await apply_matches_ranking(db, participants)
+            await db.commit()
+        except SQLAlchemyError:
+            await db.rollback()
+            logger.exception("Could not import chunk of %s matches", len(valid))
+            for line_number, _ in valid:
+                results[line_number] = error(line_number, "Database error")
+        else:
+            for (line_number, _), (match, entries) in zip(valid, participants):
+                results[line_number] = {"line": line_number, "status": "created", "id": match.id}
+                published.append(match_created_event(match, entries))
+
+    return [results[line_number] for line_number in sorted(results)], published
+
+
+@router.post("/import")
+async def import_matches(request: Request):
+    """ Importa luchas desde NDJSON (un MatchCreate por línea).
+
+    El cuerpo se procesa por bloques de IMPORT_CHUNK_SIZE líneas a medida que llega,
+    con una transacción por bloque, y el resultado de cada línea se devuelve también
+    como NDJSON en cuanto su bloque termina. La última línea resume el total.
+    """
+
+    async def results():
+        created = failed = 0
+
+        # Sesión propia: la de Depends(get_db) se cierra antes de enviar el cuerpo
+        async with async_session() as db:
+            async for lines in read_ndjson_chunks(request, settings.IMPORT_CHUNK_SIZE):
+                chunk_results, events = await import_chunk(db, lines)
+
+                for result in chunk_results:
+                    if result["status"] == "created":
+                        created += 1
+                    else:
+                        failed += 1
+                yield "".join(json.dumps(result) + "\n" for result in chunk_results)
+
+                for event in events:
+                    publish_event("MatchCreated", event)
+
+        yield json.dumps({"status": "done", "created": created, "errors": failed}) + "\n"
+
+    return DuplexStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,60 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlmodel import Session, select, func
-from typing import List, Optional, Dict 
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request, Response
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import case, exists
+from sqlalchemy.orm import aliased
+from typing import List, Optional, Dict, Tuple
+import asyncio
 import httpx 
 from datetime import datetime, timezone, timedelta 
 
-from app.db.models import Match, Rating, MatchWrestler, MatchType
+from app.db.models import Match, Rating, MatchWrestler, MatchType, MatchRatingSummary
+from app.db.rating_summary import new_summary
+from app.db.ranking import apply_match_ranking
 from app.db.session import get_db 
-from app.schemas.match import MatchCreate, MatchRead, MatchDetail, MatchUpdate
+from app.schemas.match import MatchCreate, MatchRead, MatchDetail, MatchUpdate, WrestlerMatchHistory, EventCard
 from app.core.config import settings 
+from app.core.http_client import http_client
+from app.core.cache import wrestler_cache, event_cache
+from app.core.concurrency import gather_with_deadline, UNAVAILABLE
+from app.core.conditional import Validators, page_validators, probe_page
+from app.core.export import export_query, ndjson_response
+from app.core.pagination import Keyset, paginate
+from app.core.timestamps import UtcDateTime
+from app.messaging.publisher import publish_event, match_created_event
 
 router = APIRouter()
 
+# Orden de los listados: más recientes primero (índice ix_matches_date_id)
+MATCHES_KEYSET = Keyset(Match.match_date, Match.id, descending=True)
+# Versión de cada fila para los ETag de los listados
+MATCH_VERSION_COLUMNS = (Match.id, Match.created_at, Match.updated_at)
+# /matches/export: columnas de MatchRead, en su orden
+MATCH_EXPORT_FIELDS = tuple(MatchRead.model_fields)
+
 async def get_wrestler_info(wrestler_id: int):
     """ Obtenemos información de un luchador del servicio wrestlers """
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.WRESTLERS_SERVICE_URL}/wrestlers/{wrestler_id}")
-            print(response)
+
+    async def load():
+        try:
+            response = await http_client.get("wrestlers", f"/wrestlers/{wrestler_id}")
             if response.status_code == 200:
                 return response.json()
             return None
-            
-    except httpx.RequestError:
+
+        except httpx.RequestError:
+            return None
+
+    return await wrestler_cache.get_or_load(wrestler_id, load)
+
+async def get_wrestlers_info(wrestler_ids: List[int]) -> Optional[Tuple[Dict[int, dict], List[int]]]:
+    """ Obtenemos varios luchadores con /wrestlers/batch; devuelve (encontrados, faltantes) """
+    wrestler_ids = list(dict.fromkeys(wrestler_ids))
+    if not wrestler_ids:
+        return {}, []
+
+    async def fetch_chunk(chunk: List[int]):
+        response = await http_client.get("wrestlers", "/wrestlers/batch", params={"ids": ",".join(map(str, chunk))})
+        response.raise_for_status()
+        return response.json()
+
+    async def load(ids: List[int]) -> Dict[int, dict]:
+        size = settings.WRESTLERS_BATCH_SIZE
+        chunks = [ids[i:i + size] for i in range(0, len(ids), size)]
+        payloads = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        return {wrestler["id"]: wrestler for payload in payloads for wrestler in payload["wrestlers"]}
+
+    # Solo se piden al servicio los luchadores que no están en caché
+    try:
+        found = await wrestler_cache.get_many_or_load(wrestler_ids, load)
+    except httpx.HTTPError:
         return None
 
+    return found, [wrestler_id for wrestler_id in wrestler_ids if wrestler_id not in found]
+
 async def get_event_info(event_id: int):
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.EVENTS_SERVICE_URL}/events/{event_id}")
+
+    async def load():
+        try:
+            response = await http_client.get("events", f"/events/{event_id}")
             if response.status_code == 200:
                 return response.json()
             return None
-    except httpx.RequestError:
-        return None 
+        except httpx.RequestError:
+            return None
+
+    return await event_cache.get_or_load(event_id, load)
 
         
 @router.post("/", response_model=MatchRead, status_code=status.HTTP_201_CREATED)
-async def create_match(match_data: MatchCreate, db: Session = Depends(get_db)):
+async def create_match(match_data: MatchCreate, db: AsyncSession = Depends(get_db)):
     
-    # Verificamos si el evento existe
-    event_info = await get_event_info(match_data.event_id)
+    # Verificamos el evento y todos los luchadores a la vez
+    event_info, wrestlers_info = await asyncio.gather(
+        get_event_info(match_data.event_id),
+        get_wrestlers_info([entry.wrestler_id for entry in match_data.wrestlers])
+    )
+
     if not event_info:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
 
-    # verificamos que los luchadores existan
-    for wrestler_entry in match_data.wrestlers:
-        wrestler_info = await get_wrestler_info(wrestler_entry.wrestler_id)
-        if not wrestler_info:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Wrestler with ID {wrestler_entry.wrestler_id} not found"
-            )
+    if wrestlers_info is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Wrestlers service unavailable"
+        )
+
+    _, missing = wrestlers_info
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Wrestler with ID {', '.join(map(str, missing))} not found"
+        )
 
     # Creamos la lucha 
     db_match = Match(
@@ -67,9 +125,10 @@ async def create_match(match_data: MatchCreate, db: Session = Depends(get_db)):
         main_event=match_data.main_event
     )
 
+    # flush para obtener el id sin confirmar: la lucha, sus luchadores, el resumen y el
+    # ranking se guardan en una sola transacción y un fallo no deja una lucha huérfana
     db.add(db_match)
-    db.commit()
-    db.refresh(db_match)
+    await db.flush()
 
     # Agregar los luchadores a la lucha
     for wrestler_entry in match_data.wrestlers:
@@ -82,20 +141,35 @@ async def create_match(match_data: MatchCreate, db: Session = Depends(get_db)):
 
         db.add(match_wrestler)
 
-    db.commit()
+    # Creamos el resumen de ratings vacío junto con la lucha
+    db.add(new_summary(db_match))
+
+    # Actualizamos el power ranking de los participantes en la misma transacción
+    participants = [(entry.wrestler_id, entry.is_winner, entry.team) for entry in match_data.wrestlers]
+    await apply_match_ranking(db, db_match, participants)
+    event = match_created_event(db_match, participants)
+
+    await db.commit()
+
+    # El servicio wrestlers actualiza las estadísticas de los luchadores con este evento
+    # (se encola; lo envía el hilo publicador)
+    publish_event("MatchCreated", event)
     return db_match
 
     
 @router.get("/", response_model=List[MatchRead])
 async def get_matches(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     match_type: Optional[MatchType] = None, 
     event_id: Optional[int] = None, 
     wrestler_id: Optional[int] = None,
-    from_date: Optional[datetime] = None, 
-    to_date: Optional[datetime] = None, 
-    db: Session = Depends(get_db)
+    from_date: Optional[UtcDateTime] = None, 
+    to_date: Optional[UtcDateTime] = None, 
+    db: AsyncSession = Depends(get_db)
 ):
     
     query = select(Match)
@@ -106,25 +180,149 @@ async def get_matches(
     if event_id:
         query = query.where(Match.event_id == event_id)
     if wrestler_id:
-        query = query.join(MatchWrestler).where(MatchWrestler.c.wrestler_id == wrestler_id)
+        query = query.join(MatchWrestler, MatchWrestler.match_id == Match.id).where(MatchWrestler.wrestler_id == wrestler_id)
     if from_date:
         query = query.where(Match.match_date >= from_date)
     if to_date:
         query = query.where(Match.match_date <= to_date)
 
-    # Ordenamos por fecha, más recientes primero
-    query = query.order_by(Match.match_date.desc())
+    not_modified = await probe_page(db, request, query, MATCHES_KEYSET, "matches", MATCH_VERSION_COLUMNS, limit, skip=skip, cursor=cursor)
+    if not_modified is not None:
+        return not_modified
 
-    statement = query.offset(skip).limit(limit)
-    matches = db.exec(statement).all()
+    # Ordenamos por fecha, más recientes primero; con `cursor` se ignora `skip`
+    matches = await paginate(db, query, MATCHES_KEYSET, response, limit, skip=skip, cursor=cursor)
+    page_validators("matches", matches, MATCH_VERSION_COLUMNS, response).apply(response)
 
     return matches
 
+@router.get("/export")
+async def export_matches(
+    updated_since: Optional[UtcDateTime] = None,
+    after_id: Optional[int] = None,
+    event_id: Optional[int] = None
+):
+    """ Todas las luchas (campos de MatchRead) en NDJSON, una línea por lucha """
+
+    query = select(Match).with_only_columns(*(getattr(Match, field) for field in MATCH_EXPORT_FIELDS))
+    if event_id:
+        query = query.where(Match.event_id == event_id)
+
+    return await ndjson_response(export_query(query, Match, updated_since, after_id), MATCH_EXPORT_FIELDS)
+
+@router.get("/wrestlers/{wrestler_id}", response_model=List[WrestlerMatchHistory])
+async def get_wrestler_history(
+    wrestler_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    match_type: Optional[MatchType] = None,
+    db: AsyncSession = Depends(get_db)
+):
+
+    # ¿La lucha tuvo algún ganador? Si no, cuenta como empate para todos
+    winners = aliased(MatchWrestler)
+    has_winner = exists().where(winners.match_id == Match.id, winners.is_winner == 1)
+    result = case(
+        (MatchWrestler.is_winner == 1, "win"),
+        (has_winner, "loss"),
+        else_="draw"
+    )
+
+    # Una sola consulta: participaciones del luchador (índice wrestler_id, match_id),
+    # la lucha y su resumen de ratings
+    query = (
+        select(
+            Match.id,
+            Match.event_id,
+            Match.match_type,
+            Match.title_match,
+            Match.duration,
+            Match.match_date,
+            Match.main_event,
+            MatchWrestler.team,
+            result.label("result"),
+            func.coalesce(MatchRatingSummary.average_rating, 0.0).label("average_rating"),
+            func.coalesce(MatchRatingSummary.rating_count, 0).label("rating_count")
+        )
+        .join(MatchWrestler, MatchWrestler.match_id == Match.id)
+        .outerjoin(MatchRatingSummary, MatchRatingSummary.match_id == Match.id)
+        .where(MatchWrestler.wrestler_id == wrestler_id)
+    )
+    if match_type:
+        query = query.where(Match.match_type == match_type)
+
+    rows = await paginate(db, query, MATCHES_KEYSET, response, limit, skip=skip, cursor=cursor)
+    return [WrestlerMatchHistory.model_validate(row._mapping) for row in rows]
+
+
+@router.get("/events/{event_id}", response_model=EventCard)
+async def get_event_card(event_id: int, db: AsyncSession = Depends(get_db)):
+    """ Todas las luchas de un evento con sus luchadores y ratings (lo usa GET /events/{id}/card) """
+
+    # Luchas del evento (índice ix_matches_event_date_id) con su resumen de ratings
+    statement = (
+        select(Match, MatchRatingSummary)
+        .outerjoin(MatchRatingSummary, MatchRatingSummary.match_id == Match.id)
+        .where(Match.event_id == event_id)
+        .order_by(Match.match_date, Match.id)
+    )
+    rows = (await db.exec(statement)).all()
+
+    participants: Dict[int, List[MatchWrestler]] = {match.id: [] for match, _ in rows}
+    if participants:
+        statement = select(MatchWrestler).where(MatchWrestler.match_id.in_(list(participants)))
+        for entry in (await db.exec(statement)).all():
+            participants[entry.match_id].append(entry)
+
+    # Todos los luchadores de la card en una sola consulta por lotes, con plazo máximo
+    wrestler_ids = [entry.wrestler_id for entries in participants.values() for entry in entries]
+    (wrestlers_info,), partial = await gather_with_deadline(
+        [lambda: get_wrestlers_info(wrestler_ids)],
+        limit=settings.MATCH_DETAIL_CONCURRENCY,
+        deadline=settings.MATCH_DETAIL_DEADLINE
+    )
+
+    wrestlers_found = {}
+    unavailable = []
+    if wrestlers_info is UNAVAILABLE or wrestlers_info is None:
+        partial = True
+        unavailable = [f"wrestler:{wrestler_id}" for wrestler_id in dict.fromkeys(wrestler_ids)]
+    else:
+        wrestlers_found, _ = wrestlers_info
+
+    matches = []
+    for match, summary in rows:
+        summary = summary or new_summary(match)
+        matches.append({
+            **match.model_dump(),
+            "wrestlers": [
+                {
+                    "wrestler_id": entry.wrestler_id,
+                    "wrestler": wrestlers_found.get(entry.wrestler_id),
+                    "is_winner": entry.is_winner,
+                    "team": entry.team
+                }
+                for entry in participants[match.id]
+            ],
+            "average_rating": round(summary.average_rating, 2),
+            "rating_count": summary.rating_count
+        })
+
+    return {
+        "event_id": event_id,
+        "matches": matches,
+        "partial": partial,
+        "unavailable": unavailable
+    }
+
+
 @router.get("/{match_id}", response_model=MatchDetail)
-async def get_match(match_id: int, db: Session = Depends(get_db)):
-    print("siii")
+async def get_match(match_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+
     statement = select(Match).where(Match.id == match_id)
-    match = db.exec(statement).first()
+    match = (await db.exec(statement)).first()
 
     if not match:
         raise HTTPException(
@@ -134,37 +332,67 @@ async def get_match(match_id: int, db: Session = Depends(get_db)):
 
     # Obtener los luchadores de la lucha 
     wrestler_statement = select(MatchWrestler).where(MatchWrestler.match_id == match_id)
-    wrestler_query = db.exec(wrestler_statement).all()
+    wrestler_query = (await db.exec(wrestler_statement)).all()
+
+    # Consultamos a los luchadores (en lote) y al evento en paralelo, con un plazo
+    # máximo para toda la página: lo que no llegue a tiempo se marca como no disponible
+    (wrestlers_info, event_info), partial = await gather_with_deadline(
+        [
+            lambda: get_wrestlers_info([entry.wrestler_id for entry in wrestler_query]),
+            lambda: get_event_info(match.event_id)
+        ],
+        limit=settings.MATCH_DETAIL_CONCURRENCY,
+        deadline=settings.MATCH_DETAIL_DEADLINE
+    )
+
+    wrestlers_found = {}
+    wrestlers_unavailable = wrestlers_info is UNAVAILABLE or wrestlers_info is None
+    if wrestlers_unavailable:
+        partial = True
+    else:
+        wrestlers_found, _ = wrestlers_info
 
     wrestlers_data = []
-    print(f"Los luchadores son: {wrestler_query}")
+    unavailable = []
     for wrestler_entry in wrestler_query:
-        wrestler_info = await get_wrestler_info(wrestler_entry.wrestler_id)
-        if wrestler_info:
-            wrestlers_data.append({
-                "wrestler": wrestler_info,
-                "is_winner": wrestler_entry.is_winner,
-                "team": wrestler_entry.team
-            })
-
-    # Obtener información del evento
-    event_info = await get_event_info(match.event_id)
-
-    # Calcular el promedio de ratings 
-    avg_rating_statement = select(func.avg(Rating.rating)).where(Rating.match_id == match_id)
-    avg_rating = db.exec(avg_rating_statement).one_or_none() 
-    avg_rating = avg_rating if avg_rating is not None else 0
-    
-    rating_count_statement = select(func.count(Rating.id)).where(Rating.match_id == match_id)
-    rating_count = db.exec(rating_count_statement).one_or_none() 
-    rating_count = rating_count if rating_count is not None else 0
+        wrestler_info = wrestlers_found.get(wrestler_entry.wrestler_id)
+        if wrestlers_unavailable:
+            unavailable.append(f"wrestler:{wrestler_entry.wrestler_id}")
+        wrestlers_data.append({
+            "wrestler_id": wrestler_entry.wrestler_id,
+            "wrestler": wrestler_info,
+            "is_winner": wrestler_entry.is_winner,
+            "team": wrestler_entry.team
+        })
+
+    if event_info is UNAVAILABLE:
+        unavailable.append("event")
+        event_info = None
+
+    # Promedio y número de ratings desde el resumen precalculado
+    summary = await db.get(MatchRatingSummary, match_id) or new_summary(match)
 
     match_detail = {
         **match.model_dump(),
         "wrestlers": wrestlers_data,
         "event": event_info,
-        "average_rating": round(float(avg_rating), 2),
-        "rating_count": rating_count
+        "average_rating": round(summary.average_rating, 2),
+        "rating_count": summary.rating_count,
+        "rating_histogram": summary.histogram,
+        "partial": partial,
+        "unavailable": unavailable
     }
 
+    # Una respuesta incompleta no debe quedar en caché como válida. La versión incluye
+    # los datos de luchadores y evento: si cambian en sus servicios, cambia el ETag
+    if not partial:
+        validators = Validators.for_rows(f"match-{match_id}", [
+            (match.created_at, match.updated_at, summary.updated_at),
+            [entry["wrestler"] for entry in wrestlers_data],
+            [event_info]
+        ])
+        if validators.matches(request):
+            return validators.not_modified()
+        validators.apply(response)
+
     return match_detail
\ No newline at end of file
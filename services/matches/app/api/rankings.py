@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+
+from app.core.timestamps import UtcDateTime
+from app.db.models import WrestlerPowerRating, WrestlerRatingHistory
+from app.db.session import get_db
+from app.schemas.ranking import WrestlerRanking
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[WrestlerRanking])
+async def get_power_rankings(
+    skip: int = 0,
+    limit: int = Query(default=25, le=100),
+    min_matches: int = 1,
+    at: Optional[UtcDateTime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+
+    if at is None:
+        # Ranking actual, mantenido con cada lucha nueva
+        query = (
+            select(
+                WrestlerPowerRating.wrestler_id,
+                WrestlerPowerRating.rating,
+                WrestlerPowerRating.matches,
+                WrestlerPowerRating.last_match_id,
+                WrestlerPowerRating.last_match_date
+            )
+            .where(WrestlerPowerRating.matches >= min_matches)
+            .order_by(WrestlerPowerRating.rating.desc(), WrestlerPowerRating.wrestler_id)
+        )
+    else:
+        # Ranking en una fecha: última entrada del historial de cada luchador hasta `at`
+        latest = (
+            select(
+                WrestlerRatingHistory.wrestler_id,
+                WrestlerRatingHistory.rating,
+                WrestlerRatingHistory.matches,
+                WrestlerRatingHistory.match_id.label("last_match_id"),
+                WrestlerRatingHistory.match_date.label("last_match_date"),
+                func.row_number().over(
+                    partition_by=WrestlerRatingHistory.wrestler_id,
+                    order_by=(WrestlerRatingHistory.match_date.desc(), WrestlerRatingHistory.id.desc())
+                ).label("row_number")
+            )
+            .where(WrestlerRatingHistory.match_date <= at)
+            .subquery()
+        )
+        query = (
+            select(
+                latest.c.wrestler_id,
+                latest.c.rating,
+                latest.c.matches,
+                latest.c.last_match_id,
+                latest.c.last_match_date
+            )
+            .where(latest.c.row_number == 1, latest.c.matches >= min_matches)
+            .order_by(latest.c.rating.desc(), latest.c.wrestler_id)
+        )
+
+    rows = (await db.exec(query.offset(skip).limit(limit))).all()
+
+    return [
+        WrestlerRanking(
+            position=skip + index + 1,
+            wrestler_id=wrestler_id,
+            rating=round(rating, 1),
+            matches=matches,
+            last_match_id=last_match_id,
+            last_match_date=last_match_date
+        )
+        for index, (wrestler_id, rating, matches, last_match_id, last_match_date) in enumerate(rows)
+    ]
@@ -1,52 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlmodel import Session, select
+import os
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
-import httpx
+from datetime import datetime
 
-from app.db.models import Match, Rating
+from app.db.models import Match, Rating, MatchRatingSummary, MatchType
+from app.db.rating_summary import apply_rating_change
 from app.db.session import get_db
+from app.db.snapshot import DATASETS, SNAPSHOT_FORMATS, dataset_dir, read_manifest
 from app.schemas.rating import RatingCreate, RatingRead, RatingUpdate, TopRatedMatch
 from app.core.config import settings 
+from app.core.export import export_query, ndjson_response
+from app.core.jwt_verify import Principal, get_principal
+from app.core.timestamps import UtcDateTime
+from app.messaging.publisher import publish_event, match_rating_changed_event
 
 router = APIRouter()
 
-async def get_current_user(token: str) -> int:
-    """ Obtener el ID del usuario actual desde el token de autenticación"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.AUTH_SERVICE_URL}/users/me", headers={"Authorization": f"Bearer {token.strip()}"})
+# /ratings/export: columnas de RatingRead, en su orden
+RATING_EXPORT_FIELDS = tuple(RatingRead.model_fields)
 
-            if response.status_code == 200:
-               user = response.json()
-               return user["id"]
-
-            return None
-
-    except httpx.RequestError:
-        return None
-
-        
 @router.post("/", response_model=RatingRead, status_code=status.HTTP_201_CREATED)
-async def rate_match(rating_data: RatingCreate, db: Session = Depends(get_db), authorization: Optional[str] = Header(None)):
+async def rate_match(
+    rating_data: RatingCreate,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_principal)
+):
     
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not Authenticated"
-        )
-
-    token = authorization.replace("Bearer", "")
-    user_id = await get_current_user(token)
-
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
+    # Usuario del token, ya verificado por el middleware
+    user_id = principal.user_id
 
     # Verificamos que la lucha existe
     statement = select(Match).where(Match.id == rating_data.match_id)
-    match = db.exec(statement).first()
+    match = (await db.exec(statement)).first()
 
     if not match:
         raise HTTPException(
@@ -56,7 +44,7 @@ async def rate_match(rating_data: RatingCreate, db: Session = Depends(get_db), a
 
     # Verificamos si el usuario ya ha calificado esta lucha.
     statement = select(Rating).where(Rating.match_id == rating_data.match_id, Rating.user_id == user_id)
-    existing_rating = db.exec(statement).first()
+    existing_rating = (await db.exec(statement)).first()
 
     if existing_rating:
         raise HTTPException(
@@ -73,18 +61,113 @@ async def rate_match(rating_data: RatingCreate, db: Session = Depends(get_db), a
     )
 
     db.add(db_rating)
-    db.commit()
-    db.refresh(db_rating)
+    summary = await apply_rating_change(db, rating_data.match_id, old=None, new=rating_data.rating)
+    event = match_rating_changed_event(summary)
+    await db.commit()
+    await db.refresh(db_rating)
+
+    publish_event("MatchRatingChanged", event)
 
     return db_rating
 
     
+@router.get("/top", response_model=List[TopRatedMatch])
+async def get_top_rated_matches(
+    skip: int = 0,
+    limit: int = Query(default=10, le=100),
+    match_type: Optional[MatchType] = None,
+    event_id: Optional[int] = None,
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    min_votes: int = settings.RANKING_MIN_VOTES,
+    db: AsyncSession = Depends(get_db)
+):
+    
+    # El ranking se sirve desde match_rating_summary, que se actualiza con cada rating
+    query = (
+        select(Match, MatchRatingSummary)
+        .join(MatchRatingSummary, MatchRatingSummary.match_id == Match.id)
+        .where(MatchRatingSummary.rating_count >= min_votes)
+    )
+
+    if match_type:
+        query = query.where(MatchRatingSummary.match_type == match_type.value)
+    if event_id:
+        query = query.where(MatchRatingSummary.event_id == event_id)
+    if year:
+        query = query.where(
+            MatchRatingSummary.match_date >= datetime(year, 1, 1),
+            MatchRatingSummary.match_date < datetime(year + 1, 1, 1)
+        )
+
+    query = query.order_by(
+        MatchRatingSummary.weighted_rating.desc(),
+        MatchRatingSummary.rating_count.desc(),
+        MatchRatingSummary.match_id
+    )
+    rows = (await db.exec(query.offset(skip).limit(limit))).all()
+
+    return [
+        TopRatedMatch(
+            **match.model_dump(),
+            average_rating=round(summary.average_rating, 2),
+            weighted_rating=round(summary.weighted_rating, 3),
+            rating_count=summary.rating_count
+        )
+        for match, summary in rows
+    ]
+
+
+@router.get("/export")
+async def export_ratings(
+    updated_since: Optional[UtcDateTime] = None,
+    after_id: Optional[int] = None,
+    match_id: Optional[int] = None
+):
+    """ Todos los ratings (campos de RatingRead) en NDJSON, una línea por rating """
+
+    query = select(Rating).with_only_columns(*(getattr(Rating, field) for field in RATING_EXPORT_FIELDS))
+    if match_id:
+        query = query.where(Rating.match_id == match_id)
+
+    return await ndjson_response(export_query(query, Rating, updated_since, after_id), RATING_EXPORT_FIELDS)
+
+
+@router.get("/snapshots/{dataset}")
+async def get_snapshot_manifest(dataset: str):
+    """ Manifest del snapshot columnar: particiones (mes de match_date), filas y versión
+    de cada una. Para actualizar una copia local basta con descargar las particiones
+    cuya versión cambió.
+    """
+    manifest = read_manifest(dataset) if dataset in DATASETS else None
+    if manifest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return manifest
+
+
+@router.get("/snapshots/{dataset}/{partition}")
+async def get_snapshot_partition(dataset: str, partition: str):
+    """ Fichero Arrow IPC o Parquet de una partición del snapshot """
+
+    # Solo se sirven ficheros listados en el manifest
+    manifest = read_manifest(dataset) if dataset in DATASETS else None
+    entry = manifest["partitions"].get(partition) if manifest else None
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot partition not found")
+
+    _, media_type = SNAPSHOT_FORMATS[manifest["format"]]
+    return FileResponse(
+        os.path.join(dataset_dir(dataset), entry["file"]),
+        media_type=media_type,
+        filename=f"{dataset}-{entry['file']}"
+    )
+
+
 @router.get("/match/{match_id}", response_model=List[RatingRead])
-def get_match_ratings(match_id: int, db: Session = Depends(get_db)):
+async def get_match_ratings(match_id: int, db: AsyncSession = Depends(get_db)):
     
     # Verificamos que la lucha exista
     statement = select(Match).where(Match.id == match_id)
-    match = db.exec(statement).first()
+    match = (await db.exec(statement)).first()
 
     if not match:
         raise HTTPException(
@@ -93,7 +176,7 @@ def get_match_ratings(match_id: int, db: Session = Depends(get_db)):
         )
 
     statement = select(Rating).where(Rating.match_id == match_id)
-    ratings = db.exec(statement).all()
+    ratings = (await db.exec(statement)).all()
 
     return ratings 
     
@@ -102,27 +185,15 @@ def get_match_ratings(match_id: int, db: Session = Depends(get_db)):
 async def update_rating(
     rating_id: int, 
     rating_update: RatingUpdate,
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_principal)
 ):
     
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-
-    token = authorization.replace("Bearer", "")
-    user_id = await get_current_user(token)
-
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
+    # Usuario del token, ya verificado por el middleware
+    user_id = principal.user_id
 
     rating_query = select(Rating).where(Rating.id == rating_id)
-    rating_db = db.exec(rating_query).first()
+    rating_db = (await db.exec(rating_query)).first()
 
     if not rating_db:
         raise HTTPException(
@@ -138,35 +209,36 @@ async def update_rating(
         )
 
     # Actualizar el rating 
+    old_rating = rating_db.rating
     for key, value in rating_update.model_dump(exclude_unset=True).items():
         setattr(rating_db, key, value)
 
+    event = None
+    if rating_db.rating != old_rating:
+        summary = await apply_rating_change(db, rating_db.match_id, old=old_rating, new=rating_db.rating)
+        event = match_rating_changed_event(summary)
+
     db.add(rating_db)
-    db.commit()
-    db.refresh(rating_db)
+    await db.commit()
+    await db.refresh(rating_db)
+
+    if event:
+        publish_event("MatchRatingChanged", event)
     return rating_db
 
     
 @router.delete("/{rating_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_rating(rating_id: int, db: Session = Depends(get_db), authorization: Optional[str] = Header(None)):
+async def delete_rating(
+    rating_id: int,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_principal)
+):
     
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-
-    token = authorization.replace("Bearer", "")
-    user_id = await get_current_user(token)
-
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
+    # Usuario del token, ya verificado por el middleware
+    user_id = principal.user_id
 
     rating_query = select(Rating).where(Rating.id == rating_id)
-    rating_db = db.exec(rating_query).first()
+    rating_db = (await db.exec(rating_query)).first()
 
     if not rating_db:
         raise HTTPException(
@@ -182,6 +254,10 @@ async def delete_rating(rating_id: int, db: Session = Depends(get_db), authoriza
         )
 
     # Eliminamos el rating
-    db.delete(rating_db)
-    db.commit()
+    summary = await apply_rating_change(db, rating_db.match_id, old=rating_db.rating, new=None)
+    event = match_rating_changed_event(summary)
+    await db.delete(rating_db)
+    await db.commit()
+
+    publish_event("MatchRatingChanged", event)
     return None
\ No newline at end of file
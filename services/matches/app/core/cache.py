@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List
+
+from app.core.config import settings
+
+
+class AsyncTTLCache:
+    """ Caché en memoria (LRU con TTL) para respuestas de otros servicios.
+
+    Las consultas concurrentes de una misma clave que no está en caché comparten
+    una única petición al servicio (single-flight). Solo se guardan valores
+    distintos de None, así que los errores y los 404 no se cachean.
+    Pensada para usarse desde el event loop; no es thread-safe.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _get(self, key: Hashable):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if value is None:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        # Una carga en curso podría traer el valor anterior: deja de registrarse
+        self._inflight.pop(key, None)
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._inflight.clear()
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def _track(self, key: Hashable, task: asyncio.Task):
+        """ Registra una carga en curso; al terminar guarda el valor y libera la clave """
+        self._inflight[key] = task
+
+        def done(finished: asyncio.Task):
+            current = self._inflight.get(key) is finished
+            if current:
+                del self._inflight[key]
+            if finished.cancelled():
+                return
+            # Recuperamos la excepción aunque ya nadie espere el resultado
+            if finished.exception() is None and current:
+                self.set(key, finished.result())
+
+        task.add_done_callback(done)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._track(key, task)
+
+        # shield: si el que inició la carga se cancela, los demás siguen esperándola
+        return await asyncio.shield(task)
+
+    async def get_many_or_load(
+        self,
+        keys: Iterable[Hashable],
+        loader: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+    ) -> Dict[Hashable, Any]:
+        """ Como get_or_load para varias claves: las que faltan se piden en una sola llamada
+        a `loader`, que devuelve {clave: valor} (las claves ausentes se consideran inexistentes) """
+        results = {}
+        waiting = {}
+        to_load = []
+        for key in dict.fromkeys(keys):
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                results[key] = value
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                to_load.append(key)
+
+        if to_load:
+            batch = asyncio.ensure_future(loader(to_load))
+
+            async def pick(key):
+                values = await asyncio.shield(batch)
+                return values.get(key)
+
+            for key in to_load:
+                task = asyncio.ensure_future(pick(key))
+                self._track(key, task)
+                waiting[key] = task
+
+        if waiting:
+            values = await asyncio.shield(asyncio.gather(*waiting.values()))
+            for key, value in zip(waiting, values):
+                if value is not None:
+                    results[key] = value
+
+        return results
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "inflight": len(self._inflight),
+        }
+
+
+# Luchadores (con estadísticas) y eventos, por ID
+wrestler_cache = AsyncTTLCache("wrestlers", settings.WRESTLER_CACHE_SIZE, settings.WRESTLER_CACHE_TTL)
+event_cache = AsyncTTLCache("events", settings.EVENT_CACHE_SIZE, settings.EVENT_CACHE_TTL)
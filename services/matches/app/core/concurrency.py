@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Tuple
+
+# Marca el resultado de una consulta que no terminó antes del plazo
+UNAVAILABLE = object()
+
+
+async def gather_with_deadline(
+    calls: List[Callable[[], Awaitable[Any]]],
+    limit: int,
+    deadline: float,
+) -> Tuple[List[Any], bool]:
+    """ Ejecuta las llamadas de forma concurrente, con como mucho `limit` en vuelo.
+
+    Las que no terminan dentro de `deadline` segundos (o que fallan) se cancelan
+    y su posición en la lista de resultados queda como `UNAVAILABLE`. Devuelve
+    los resultados en el mismo orden que `calls` y si alguno quedó incompleto.
+    """
+    if not calls:
+        return [], False
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(call):
+        async with semaphore:
+            return await call()
+
+    tasks = [asyncio.create_task(run(call)) for call in calls]
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = []
+    partial = False
+    for task in tasks:
+        if task in done and task.exception() is None:
+            results.append(task.result())
+        else:
+            results.append(UNAVAILABLE)
+            partial = True
+
+    return results, partial
@@ -0,0 +1,107 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.core.pagination import NEXT_CURSOR_HEADER, Keyset, fetch_rows, page_query
+
+# Los cachés (navegador, gateway) pueden guardar la respuesta pero deben revalidarla
+CACHE_CONTROL = "no-cache"
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """ Las columnas datetime se guardan en UTC sin zona horaria """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class Validators:
+    """ ETag y Last-Modified de una respuesta para las peticiones condicionales.
+
+    Se calculan con consultas que solo leen ids y fechas (created_at/updated_at);
+    si el cliente ya tiene esa versión se responde 304 sin cargar ni serializar
+    las filas completas.
+    """
+
+    def __init__(self, etag: str, last_modified: Optional[datetime] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def for_item(cls, kind: str, item_id: int, *timestamps: Optional[datetime]) -> "Validators":
+        """ Versión de un recurso: la fecha más reciente entre la suya y la de lo que incluye """
+        known = [as_utc(value) for value in timestamps if value is not None]
+        version = max(known) if known else None
+        stamp = int(version.timestamp() * 1_000_000) if version else 0
+        return cls(f'"{kind}-{item_id}-{stamp}"', version)
+
+    @classmethod
+    def for_rows(cls, kind: str, rows) -> "Validators":
+        """ Huella de una página de un listado; cambia si se añade, modifica o borra una fila.
+
+        Sin Last-Modified: un borrado no hace más reciente ninguna de las fechas.
+        """
+        digest = hashlib.sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()
+        return cls(f'"{kind}-{digest}"')
+
+    def matches(self, request: Request) -> bool:
+        """ ¿El cliente ya tiene esta versión? If-None-Match manda sobre If-Modified-Since """
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # Comparación débil (RFC 9110): W/"x" equivale a "x"
+            return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+        if_modified_since = request.headers.get("If-Modified-Since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # Las fechas HTTP tienen resolución de segundos
+        return self.last_modified.replace(microsecond=0) <= since
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers())
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers())
+
+
+def is_conditional(request: Request) -> bool:
+    return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+
+
+def page_fingerprint(kind: str, versions, has_next: bool) -> Validators:
+    """ Huella de una página: (id, fechas) de sus filas y si hay página siguiente """
+    return Validators.for_rows(kind, [*versions, (has_next,)])
+
+
+async def probe_page(db, request: Request, query, keyset: Keyset, kind: str, columns, limit: int, skip: int = 0, cursor: Optional[str] = None) -> Optional[Response]:
+    """ 304 si el cliente ya tiene la página que devolvería paginate(), o None.
+
+    Solo consulta (leyendo únicamente `columns`) si la petición trae cabeceras
+    condicionales; las demás no pagan una segunda consulta.
+    """
+    if not is_conditional(request):
+        return None
+    rows = await fetch_rows(db, page_query(query.with_only_columns(*columns), keyset, limit, skip=skip, cursor=cursor))
+    validators = page_fingerprint(kind, rows[:limit], len(rows) > limit)
+    return validators.not_modified() if validators.matches(request) else None
+
+
+def page_validators(kind: str, rows, columns, response: Response) -> Validators:
+    """ Validadores de una página ya leída por paginate(), con los mismos valores que probe_page """
+    keys = [column.key for column in columns]
+    versions = [tuple(getattr(row, key) for key in keys) for row in rows]
+    return page_fingerprint(kind, versions, NEXT_CURSOR_HEADER in response.headers)
@@ -1,5 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,6 +12,74 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL")
     WRESTLERS_SERVICE_URL: str = os.getenv("WRESTLERS_SERVICE_URL")
     EVENTS_SERVICE_URL: str = os.getenv("EVENTS_SERVICE_URL")
+    RABBITMQ_HOST: str = os.getenv("RABBITMQ_HOST", "localhost")
+    RABBITMQ_PORT: int = 5672
+
+    # Publicación de match_events: buffer en memoria y un tx_commit por lote
+    MATCH_EVENTS_BUFFER_SIZE: int = 10000
+    MATCH_EVENTS_BATCH_SIZE: int = 100
+    MATCH_EVENTS_BATCH_WAIT: float = 0.05 # segundos que se esperan más eventos para el lote
+    MATCH_EVENTS_RETRY_DELAY: float = 5.0
+
+    # Pool HTTP compartido para las llamadas entre servicios
+    HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 2.0
+    HTTP_POOL_TIMEOUT: float = 1.0
+    HTTP_MAX_CONNECTIONS_PER_TARGET: int = 50
+    HTTP_MAX_KEEPALIVE_PER_TARGET: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Consultas concurrentes del detalle de una lucha
+    MATCH_DETAIL_CONCURRENCY: int = 10
+    MATCH_DETAIL_DEADLINE: float = 2.0
+
+    # Luchadores por petición a /wrestlers/batch
+    WRESTLERS_BATCH_SIZE: int = 100
+
+    # Importación NDJSON: líneas por transacción y consultas de validación
+    IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_LOOKUP_CONCURRENCY: int = 20
+    IMPORT_LOOKUP_DEADLINE: float = 30.0
+
+    # Caché en memoria de luchadores y eventos (TTL en segundos)
+    WRESTLER_CACHE_SIZE: int = 2048
+    WRESTLER_CACHE_TTL: float = 60.0
+    EVENT_CACHE_SIZE: int = 512
+    EVENT_CACHE_TTL: float = 300.0
+    CATALOG_EVENTS_RETRY_DELAY: float = 5.0
+
+    # Ranking de /ratings/top (promedio bayesiano)
+    RANKING_PRIOR_MEAN: float = 3.0
+    RANKING_PRIOR_VOTES: int = 10
+    RANKING_MIN_VOTES: int = 1
+
+    # Power ranking de luchadores (Elo)
+    RANKING_INITIAL_RATING: float = 1500.0
+    RANKING_K_FACTOR: float = 32.0
+
+    # Descargas NDJSON (/export): filas por lectura del cursor del servidor
+    EXPORT_CHUNK_SIZE: int = 1000
+    EXPORT_STATEMENT_TIMEOUT_MS: int = 0 # sin límite durante una descarga
+
+    # Snapshots columnares (Arrow IPC / Parquet) de ratings y resultados de luchas
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "snapshots")
+    SNAPSHOT_FORMAT: str = "arrow" # arrow (lectura sin copias) o parquet
+    SNAPSHOT_BATCH_ROWS: int = 65536 # filas por lectura del cursor y por row group
+
+    # Pool de conexiones a la base de datos
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800 # segundos
+    DB_STATEMENT_TIMEOUT_MS: int = 15000 # 0 para desactivarlo
+    DB_ECHO: bool = False
+
+    # Verificación local de los JWT de auth con sus claves públicas (/auth/jwks)
+    JWT_JWKS_TTL: float = 3600.0
+    JWT_JWKS_MIN_REFRESH: float = 30.0 # segundos entre recargas forzadas por un kid desconocido
+    JWT_JWKS_TIMEOUT: float = 2.0
+    # Secreto compartido con auth para sus tokens HS256 (si auth no firma con RSA)
+    JWT_SECRET_KEY: Optional[str] = os.getenv("JWT_SECRET_KEY")
 
     class Config:
         case_sensitive = True
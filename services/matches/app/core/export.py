@@ -0,0 +1,77 @@
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def export_query(query, model, updated_since: Optional[datetime] = None, after_id: Optional[int] = None):
+    """ Filtros comunes de /export, en orden de id para poder reanudar con `after_id`.
+
+    `updated_since` compara updated_at (o created_at si nunca se modificó) para las
+    descargas incrementales; las filas borradas no aparecen en ellas.
+    """
+    if updated_since is not None:
+        query = query.where(func.coalesce(model.updated_at, model.created_at) >= updated_since)
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    return query.order_by(model.id)
+
+
+def trailer(complete: bool, rows: int) -> bytes:
+    """ Última línea de cada descarga: sin {"complete": true} la descarga quedó cortada """
+    return orjson.dumps({"complete": complete, "rows": rows}) + b"\n"
+
+
+async def ndjson_rows(statement, fields: Tuple[str, ...]) -> AsyncIterator[bytes]:
+    """ Una línea JSON por fila, leyendo con un cursor del servidor por bloques.
+
+    Usa su propia sesión: la de get_db se cierra antes de que empiece a enviarse el
+    cuerpo. En memoria solo hay un bloque de EXPORT_CHUNK_SIZE filas cada vez. El
+    primer valor (vacío) se produce después de leer el primer bloque; ver ndjson_response.
+    """
+    async with async_session() as db:
+        connection = await db.connection()
+        if connection.dialect.name == "postgresql":
+            # Una descarga completa puede durar más que DB_STATEMENT_TIMEOUT_MS
+            await connection.execute(text(f"SET LOCAL statement_timeout = {int(settings.EXPORT_STATEMENT_TIMEOUT_MS)}"))
+
+        result = await connection.stream(statement.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE))
+        partitions = result.partitions()
+        rows = await anext(partitions, None)
+        yield b""
+
+        count = 0
+        try:
+            while rows is not None:
+                count += len(rows)
+                yield b"".join(orjson.dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+                rows = await anext(partitions, None)
+        except SQLAlchemyError:
+            # Las cabeceras (200) ya se enviaron: el error solo se puede indicar en el cuerpo
+            logger.exception("Export interrupted after %s rows", count)
+            yield trailer(False, count)
+            return
+        yield trailer(True, count)
+
+
+async def ndjson_response(statement, fields: Tuple[str, ...]) -> StreamingResponse:
+    """ Descarga NDJSON terminada en la línea de trailer().
+
+    La consulta se ejecuta y se lee su primer bloque antes de devolver la respuesta:
+    un error ahí (timeout, conversión de una columna) es una respuesta de error normal
+    y no un 200 con el cuerpo cortado.
+    """
+    body = ndjson_rows(statement, fields)
+    await anext(body)
+    return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,150 @@
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+class PoolStats:
+    """ Contadores de uso del pool de conexiones hacia un servicio """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.errors = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.pool_wait_total += seconds
+        self.pool_wait_max = max(self.pool_wait_max, seconds)
+
+
+class ServiceHTTPClient:
+    """ Cliente HTTP de larga vida (keep-alive) para las llamadas entre servicios.
+
+    Cada servicio destino tiene su propio transporte, de modo que los límites
+    del pool se aplican por destino y un servicio lento no agota las
+    conexiones de los demás.
+    """
+
+    def __init__(self, targets: Dict[str, Optional[str]]):
+        self._targets = targets
+        self._stats = {name: PoolStats() for name in targets}
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_PER_TARGET,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_PER_TARGET,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    def open(self):
+        """ Crea el cliente y un transporte por cada servicio configurado """
+        if self._client is not None:
+            return
+
+        mounts = {}
+        for name, base_url in self._targets.items():
+            if not base_url:
+                continue
+            url = httpx.URL(base_url)
+            pattern = f"{url.scheme}://{url.netloc.decode()}"
+            if pattern not in mounts:
+                mounts[pattern] = httpx.AsyncHTTPTransport(limits=self._limits())
+            self._transports[name] = mounts[pattern]
+
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                pool=settings.HTTP_POOL_TIMEOUT,
+            ),
+            limits=self._limits(),
+            mounts=mounts,
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._transports = {}
+
+    async def get(self, target: str, path: str, **kwargs) -> httpx.Response:
+        """ GET contra `target` reutilizando las conexiones del pool """
+        if self._client is None:
+            self.open()
+
+        stats = self._stats[target]
+        stats.requests += 1
+        started = time.perf_counter()
+        waited = False
+        connected = False
+
+        # httpcore reporta las fases de la petición; el tiempo hasta la primera
+        # fase es el que la petición pasó esperando una conexión libre.
+        async def trace(event_name: str, info: dict):
+            nonlocal waited, connected
+            if not waited and event_name.endswith(".started"):
+                waited = True
+                stats.record_wait(time.perf_counter() - started)
+            if event_name == "connection.connect_tcp.started":
+                connected = True
+                stats.new_connections += 1
+            elif event_name.endswith("send_request_headers.started") and not connected:
+                stats.reused_connections += 1
+
+        try:
+            return await self._client.get(
+                f"{self._targets[target]}{path}",
+                extensions={"trace": trace},
+                **kwargs,
+            )
+        except httpx.RequestError:
+            stats.errors += 1
+            raise
+
+    def stats(self) -> dict:
+        """ Métricas del pool por servicio destino para poder dimensionarlo """
+        result = {}
+        for name, stats in self._stats.items():
+            transport = self._transports.get(name)
+            pool = getattr(transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            handled = stats.new_connections + stats.reused_connections
+
+            result[name] = {
+                "base_url": self._targets[name],
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "new_connections": stats.new_connections,
+                "reused_connections": stats.reused_connections,
+                "reuse_ratio": round(stats.reused_connections / handled, 4) if handled else 0.0,
+                "open_connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c.is_idle()),
+                "avg_pool_wait_ms": round(stats.pool_wait_total / stats.requests * 1000, 3) if stats.requests else 0.0,
+                "max_pool_wait_ms": round(stats.pool_wait_max * 1000, 3),
+            }
+
+        return {
+            "limits": {
+                "max_connections_per_target": settings.HTTP_MAX_CONNECTIONS_PER_TARGET,
+                "max_keepalive_per_target": settings.HTTP_MAX_KEEPALIVE_PER_TARGET,
+                "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+                "timeout": settings.HTTP_TIMEOUT,
+                "connect_timeout": settings.HTTP_CONNECT_TIMEOUT,
+                "pool_timeout": settings.HTTP_POOL_TIMEOUT,
+            },
+            "targets": result,
+        }
+
+
+http_client = ServiceHTTPClient({
+    "auth": settings.AUTH_SERVICE_URL,
+    "wrestlers": settings.WRESTLERS_SERVICE_URL,
+    "events": settings.EVENTS_SERVICE_URL,
+})
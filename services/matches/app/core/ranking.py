@@ -0,0 +1,120 @@
+""" Motor de power ranking tipo Elo para luchadores.
+
+Cada lucha se reduce a "lados" (un luchador o un equipo) que se enfrentan todos
+contra todos: el resultado real de cada par es 1, 0.5 o 0 según quién ganó y el
+esperado sale de la fórmula de Elo con el rating medio de cada lado. La variación
+de cada lado se reparte entre sus rivales (K / (lados - 1)), así una battle royal
+de 30 no mueve más puntos que un singles.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.db.models import MatchType
+
+# Participante de una lucha: (wrestler_id, is_winner, team)
+Participant = Tuple[int, int, int]
+
+
+class RatingStore:
+    """ Ratings en arrays contiguos; `wrestler_id -> posición` en un diccionario """
+
+    def __init__(self, initial_rating: float, capacity: int = 1024):
+        self.initial_rating = initial_rating
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.ratings = np.full(capacity, initial_rating, dtype=np.float64)
+        self.matches = np.zeros(capacity, dtype=np.int32)
+        self._positions: Dict[int, int] = {}
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        self.ids = np.resize(self.ids, capacity)
+        ratings = np.full(capacity, self.initial_rating, dtype=np.float64)
+        ratings[:self.size] = self.ratings[:self.size]
+        self.ratings = ratings
+        matches = np.zeros(capacity, dtype=np.int32)
+        matches[:self.size] = self.matches[:self.size]
+        self.matches = matches
+
+    def load(self, wrestler_id: int, rating: float, matches: int):
+        position = self.position(wrestler_id)
+        self.ratings[position] = rating
+        self.matches[position] = matches
+
+    def position(self, wrestler_id: int) -> int:
+        position = self._positions.get(wrestler_id)
+        if position is None:
+            if self.size == len(self.ids):
+                self._grow()
+            position = self.size
+            self.ids[position] = wrestler_id
+            self._positions[wrestler_id] = position
+            self.size += 1
+        return position
+
+    def positions(self, wrestler_ids: Iterable[int]) -> np.ndarray:
+        return np.fromiter((self.position(w) for w in wrestler_ids), dtype=np.int64)
+
+    def items(self) -> Iterable[Tuple[int, float, int]]:
+        for position in range(self.size):
+            yield int(self.ids[position]), float(self.ratings[position]), int(self.matches[position])
+
+
+def match_sides(match_type: MatchType, participants: Sequence[Participant]) -> Tuple[np.ndarray, np.ndarray]:
+    """ Devuelve, por participante, el índice de su lado y, por lado, si ganó (1) o no (0) """
+    teams = [team for _, _, team in participants]
+    winners = np.array([1 if is_winner else 0 for _, is_winner, _ in participants], dtype=np.int8)
+
+    if len(set(teams)) > 1:
+        # Equipos declarados: cada valor de `team` es un lado
+        _, side_of = np.unique(np.array(teams), return_inverse=True)
+    elif match_type == MatchType.TAG_TEAM and 0 < winners.sum() < len(participants):
+        # Lucha por parejas sin equipos: ganadores contra perdedores
+        side_of = 1 - winners.astype(np.int64)
+    else:
+        # Singles y luchas de varios: cada luchador es su propio lado
+        side_of = np.arange(len(participants))
+
+    side_won = np.zeros(side_of.max() + 1, dtype=np.int8)
+    np.maximum.at(side_won, side_of, winners)
+    return side_of, side_won
+
+
+def side_deltas(side_ratings: np.ndarray, side_won: np.ndarray, k_factor: float) -> np.ndarray:
+    """ Variación de rating de cada lado en una sola operación matricial """
+    sides = len(side_ratings)
+    if sides < 2:
+        return np.zeros(sides)
+
+    expected = 1.0 / (1.0 + 10.0 ** ((side_ratings[None, :] - side_ratings[:, None]) / 400.0))
+    actual = (side_won[:, None] > side_won[None, :]) + 0.5 * (side_won[:, None] == side_won[None, :])
+    # La diagonal (un lado contra sí mismo) vale 0.5 en ambos y no aporta
+    return k_factor / (sides - 1) * (actual - expected).sum(axis=1)
+
+
+def apply_match(
+    store: RatingStore,
+    match_type: MatchType,
+    participants: Sequence[Participant],
+    k_factor: float,
+) -> List[Tuple[int, float, float]]:
+    """ Actualiza el store con una lucha; devuelve (wrestler_id, rating, delta) por participante """
+    if len(participants) < 2:
+        return []
+
+    positions = store.positions(wrestler_id for wrestler_id, _, _ in participants)
+    side_of, side_won = match_sides(match_type, participants)
+
+    # Rating de cada lado = media de sus miembros
+    side_totals = np.bincount(side_of, weights=store.ratings[positions])
+    side_ratings = side_totals / np.bincount(side_of)
+
+    deltas = side_deltas(side_ratings, side_won, k_factor)[side_of]
+    store.ratings[positions] += deltas
+    store.matches[positions] += 1
+
+    return [
+        (wrestler_id, float(store.ratings[position]), float(delta))
+        for (wrestler_id, _, _), position, delta in zip(participants, positions, deltas)
+    ]
@@ -1,6 +1,8 @@
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Column, JSON, Index
 from typing import List, Optional
-from datetime import datetime, timezone
+from datetime import datetime
+from app.core.timestamps import utcnow
 from enum import Enum
 
 # Enum para los tipos de lucha
@@ -24,6 +26,10 @@ class MatchType(str, Enum):
 class MatchWrestler(SQLModel, table=True):
     
     __tablename__: str = "match_wrestler"
+    __table_args__ = (
+        # Historial de un luchador: la PK (match_id, wrestler_id) no sirve para buscar por luchador
+        Index("ix_match_wrestler_wrestler_match", "wrestler_id", "match_id"),
+    )
     match_id: int = Field(foreign_key="matches.id", primary_key=True)
     wrestler_id: int = Field(primary_key=True)  # ID del luchador del servicio wrestlers
     is_winner: int = Field(default=0) 
@@ -33,6 +39,12 @@ class MatchWrestler(SQLModel, table=True):
 class Match(SQLModel, table=True):
 
     __tablename__: str = "matches"
+    __table_args__ = (
+        # Orden de los listados y paginación por cursor: (match_date, id)
+        Index("ix_matches_date_id", "match_date", "id"),
+        # Luchas de un evento (card y filtro event_id) en orden de fecha
+        Index("ix_matches_event_date_id", "event_id", "match_date", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     event_id: int = Field(nullable=False) # ID del servicio de eventos
@@ -42,8 +54,8 @@ class Match(SQLModel, table=True):
     match_date: datetime = Field(nullable=False)
     description: Optional[str] = None 
     main_event: int = Field(default=0)
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
 
     # Relaciones 
     ratings: List["Rating"] = Relationship(back_populates="match")
@@ -58,7 +70,65 @@ class Rating(SQLModel, table=True):
     user_id: int = Field(nullable=False) # ID del usuario del servicio auth
     rating: float = Field(nullable=False) # 0-5 con decimales
     comment: Optional[str] = None 
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
+
+    match: Optional[Match] = Relationship(back_populates="ratings")
+
+
+class MatchRatingSummary(SQLModel, table=True):
+
+    # Resumen de ratings por lucha, mantenido en la misma transacción que cada rating.
+    # También sirve de ranking precalculado para /ratings/top.
+    __tablename__: str = "match_rating_summary"
+    __table_args__ = (
+        Index("ix_match_rating_summary_weighted", "weighted_rating"),
+        Index("ix_match_rating_summary_type_weighted", "match_type", "weighted_rating"),
+        Index("ix_match_rating_summary_event", "event_id"),
+    )
+
+    match_id: int = Field(foreign_key="matches.id", primary_key=True)
+    rating_sum: float = Field(default=0.0)
+    rating_count: int = Field(default=0)
+    average_rating: float = Field(default=0.0)
+    weighted_rating: float = Field(default=0.0) # promedio bayesiano
+    histogram: List[int] = Field(default_factory=list, sa_column=Column(JSON, nullable=False)) # buckets de 0.5 puntos
+    # Copia de los campos de la lucha por los que se filtra el ranking
+    match_type: Optional[str] = Field(default=None)
+    event_id: Optional[int] = Field(default=None)
+    match_date: Optional[datetime] = Field(default=None)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+
+
+class WrestlerPowerRating(SQLModel, table=True):
+
+    # Rating Elo actual de cada luchador, actualizado con cada lucha nueva
+    __tablename__: str = "wrestler_power_rating"
+    __table_args__ = (
+        Index("ix_wrestler_power_rating_rating", "rating"),
+    )
+
+    wrestler_id: int = Field(primary_key=True) # ID del luchador del servicio wrestlers
+    rating: float = Field(nullable=False)
+    matches: int = Field(default=0)
+    last_match_id: Optional[int] = Field(default=None)
+    last_match_date: Optional[datetime] = Field(default=None)
     updated_at: Optional[datetime] = Field(default=None, nullable=True)
 
-    match: Optional[Match] = Relationship(back_populates="ratings")
\ No newline at end of file
+
+class WrestlerRatingHistory(SQLModel, table=True):
+
+    # Rating de cada luchador después de cada lucha; permite consultar el ranking en una fecha
+    __tablename__: str = "wrestler_rating_history"
+    __table_args__ = (
+        Index("ix_wrestler_rating_history_wrestler_date", "wrestler_id", "match_date"),
+        Index("ix_wrestler_rating_history_match_date", "match_date"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    wrestler_id: int = Field(nullable=False)
+    match_id: int = Field(foreign_key="matches.id", nullable=False)
+    match_date: datetime = Field(nullable=False)
+    rating: float = Field(nullable=False)
+    delta: float = Field(default=0.0)
+    matches: int = Field(default=0)
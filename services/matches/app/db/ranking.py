@@ -0,0 +1,80 @@
+from typing import List, Sequence, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.ranking import Participant, RatingStore, apply_match
+from app.core.timestamps import utcnow
+from app.db.models import Match, WrestlerPowerRating, WrestlerRatingHistory
+
+
+async def insert_ratings_if_missing(db: AsyncSession, wrestler_ids: Sequence[int]) -> None:
+    """ Crea con RANKING_INITIAL_RATING las filas de los luchadores que aún no tienen,
+    sin fallar si otra transacción las acaba de insertar (INSERT ... ON CONFLICT DO NOTHING) """
+    connection = await db.connection()
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    rows = [{"wrestler_id": wrestler_id, "rating": settings.RANKING_INITIAL_RATING, "matches": 0} for wrestler_id in wrestler_ids]
+    await connection.execute(insert(WrestlerPowerRating).values(rows).on_conflict_do_nothing(index_elements=["wrestler_id"]))
+
+
+async def apply_match_ranking(db: AsyncSession, match: Match, participants: Sequence[Participant]) -> List[WrestlerRatingHistory]:
+    """ Actualiza de forma incremental el power ranking con una lucha nueva.
+
+    Solo se leen y escriben las filas de los participantes; no hace commit. Las luchas
+    se aplican en el orden en que llegan: si se carga una lucha con fecha anterior a
+    otras ya procesadas, rebuild_rankings recupera el orden exacto por match_date.
+    """
+    return await apply_matches_ranking(db, [(match, participants)])
+
+
+async def apply_matches_ranking(db: AsyncSession, matches: Sequence[Tuple[Match, Sequence[Participant]]]) -> List[WrestlerRatingHistory]:
+    """ Como apply_match_ranking para varias luchas: una sola lectura de los ratings
+    de todos los participantes y las luchas aplicadas en orden de fecha """
+    wrestler_ids = list({wrestler_id for _, participants in matches for wrestler_id, _, _ in participants})
+    if not wrestler_ids:
+        return []
+
+    # FOR UPDATE no bloquea filas que no existen: dos luchas concurrentes con el mismo
+    # luchador nuevo chocarían en la clave primaria. Se crean antes y así se bloquean todas
+    await insert_ratings_if_missing(db, sorted(wrestler_ids))
+    statement = (
+        select(WrestlerPowerRating)
+        .where(WrestlerPowerRating.wrestler_id.in_(wrestler_ids))
+        .order_by(WrestlerPowerRating.wrestler_id)
+        .with_for_update()
+    )
+    current = {row.wrestler_id: row for row in (await db.exec(statement)).all()}
+
+    store = RatingStore(settings.RANKING_INITIAL_RATING, capacity=len(wrestler_ids))
+    for row in current.values():
+        store.load(row.wrestler_id, row.rating, row.matches)
+
+    now = utcnow()
+    history = []
+    for match, participants in sorted(matches, key=lambda item: (item[0].match_date, item[0].id)):
+        results = apply_match(store, match.match_type, participants, settings.RANKING_K_FACTOR)
+
+        for wrestler_id, rating, delta in results:
+            row = current[wrestler_id]
+            row.rating = rating
+            row.matches = int(store.matches[store.position(wrestler_id)])
+            if row.last_match_date is None or match.match_date >= row.last_match_date:
+                row.last_match_id = match.id
+                row.last_match_date = match.match_date
+            row.updated_at = now
+            db.add(row)
+
+            entry = WrestlerRatingHistory(
+                wrestler_id=wrestler_id,
+                match_id=match.id,
+                match_date=match.match_date,
+                rating=rating,
+                delta=delta,
+                matches=row.matches
+            )
+            db.add(entry)
+            history.append(entry)
+
+    return history
@@ -0,0 +1,83 @@
+from typing import Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.timestamps import utcnow
+from app.db.models import Match, MatchRatingSummary
+
+# Un bucket por cada medio punto: 0, 0.5, 1, ..., 5
+HISTOGRAM_BUCKETS = 11
+
+
+def histogram_bucket(rating: float) -> int:
+    return min(max(int(round(rating * 2)), 0), HISTOGRAM_BUCKETS - 1)
+
+
+def weighted_rating(rating_sum: float, rating_count: int) -> float:
+    """ Promedio bayesiano: cada lucha parte de RANKING_PRIOR_VOTES votos con la nota
+    RANKING_PRIOR_MEAN, así un único 5.0 no encabeza el ranking """
+    prior_votes = settings.RANKING_PRIOR_VOTES
+    return (prior_votes * settings.RANKING_PRIOR_MEAN + rating_sum) / (prior_votes + rating_count)
+
+
+def new_summary(match: Match) -> MatchRatingSummary:
+    return MatchRatingSummary(
+        match_id=match.id,
+        histogram=[0] * HISTOGRAM_BUCKETS,
+        weighted_rating=weighted_rating(0.0, 0),
+        match_type=match.match_type.value if match.match_type else None,
+        event_id=match.event_id,
+        match_date=match.match_date
+    )
+
+
+async def insert_summary_if_missing(db: AsyncSession, match_id: int) -> None:
+    """ Crea el resumen vacío de la lucha si no existe, sin fallar si otra transacción
+    lo acaba de insertar (INSERT ... ON CONFLICT DO NOTHING) """
+    connection = await db.connection()
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    values = new_summary(await db.get(Match, match_id)).model_dump()
+    await connection.execute(insert(MatchRatingSummary).values(**values).on_conflict_do_nothing(index_elements=["match_id"]))
+
+
+async def apply_rating_change(db: AsyncSession, match_id: int, old: Optional[float], new: Optional[float]) -> MatchRatingSummary:
+    """ Aplica al resumen de la lucha el alta (old=None), cambio o baja (new=None) de un rating.
+
+    No hace commit: el llamador lo confirma junto con el propio rating.
+    """
+    statement = select(MatchRatingSummary).where(MatchRatingSummary.match_id == match_id).with_for_update()
+    summary = (await db.exec(statement)).first()
+    if not summary:
+        # Lucha sin resumen (anterior a la tabla): FOR UPDATE no bloquea filas que no
+        # existen y dos primeros ratings concurrentes chocarían en la clave primaria.
+        # Se inserta sin conflicto y se vuelve a leer, ya bloqueada
+        await insert_summary_if_missing(db, match_id)
+        summary = (await db.exec(statement)).first()
+
+    histogram = list(summary.histogram or [0] * HISTOGRAM_BUCKETS)
+
+    if old is not None:
+        summary.rating_sum -= old
+        summary.rating_count -= 1
+        histogram[histogram_bucket(old)] -= 1
+    if new is not None:
+        summary.rating_sum += new
+        summary.rating_count += 1
+        histogram[histogram_bucket(new)] += 1
+
+    if summary.rating_count > 0:
+        summary.average_rating = summary.rating_sum / summary.rating_count
+    else:
+        summary.rating_sum = 0.0
+        summary.average_rating = 0.0
+    summary.weighted_rating = weighted_rating(summary.rating_sum, summary.rating_count)
+
+    # Asignamos una lista nueva para que SQLAlchemy detecte el cambio en la columna JSON
+    summary.histogram = histogram
+    summary.updated_at = utcnow()
+
+    db.add(summary)
+    return summary
@@ -1,8 +1,63 @@
-from sqlmodel import create_engine, Session
-from app.core.config import settings 
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-engine = create_engine(settings.DATABASE_URI)
+from app.core.config import settings
 
-def get_db():
-    with Session(engine) as session:
+# Drivers async equivalentes a los de DATABASE_URI
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_uri(uri: str) -> str:
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+
+def connect_args(uri: str, asynchronous: bool) -> dict:
+    """ statement_timeout de Postgres para cada conexión del pool """
+    if make_url(uri).get_backend_name() != "postgresql" or not settings.DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    if asynchronous:
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+
+def pool_args() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+# Motor async para los endpoints: las consultas no bloquean el event loop
+engine = create_async_engine(
+    async_database_uri(settings.DATABASE_URI),
+    connect_args=connect_args(settings.DATABASE_URI, asynchronous=True),
+    echo=settings.DB_ECHO,
+    **pool_args()
+)
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+# Motor síncrono para los jobs de mantenimiento y los hilos consumidores de RabbitMQ
+sync_engine = create_engine(
+    settings.DATABASE_URI,
+    connect_args=connect_args(settings.DATABASE_URI, asynchronous=False),
+    echo=settings.DB_ECHO,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
+)
+
+
+async def create_db_and_tables():
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+
+async def get_db():
+    async with async_session() as session:
         yield session
@@ -0,0 +1,227 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from sqlalchemy import extract, func, text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.models import Match, MatchType, MatchWrestler, Rating
+
+# Formatos de los snapshots: Arrow IPC sin comprimir se puede abrir con memory_map y
+# leer sin copias; Parquet ocupa menos en disco pero hay que decodificarlo
+SNAPSHOT_FORMATS = {
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Diccionario fijo de match_type: los mismos códigos en todos los lotes y particiones
+MATCH_TYPE_VALUES = [match_type.value for match_type in MatchType]
+MATCH_TYPE_CODES = {match_type: code for code, match_type in enumerate(MatchType)}
+MATCH_TYPE_DICTIONARY = pa.array(MATCH_TYPE_VALUES, type=pa.string())
+MATCH_TYPE = pa.dictionary(pa.int8(), pa.string())
+
+# El resto de columnas nunca son nulas y se pasan a NumPy sin copias
+NULLABLE = {"duration", "updated_at"}
+
+
+class Dataset:
+    """ Una tabla del snapshot: columnas (nombre, expresión, tipo Arrow) unidas a matches.
+
+    Se particiona por mes de match_date. `versions` son los agregados que cambian
+    cuando se añade, modifica o borra una fila de la partición.
+    """
+
+    def __init__(self, name: str, columns: List[Tuple[str, object, pa.DataType]], join, order, versions):
+        self.name = name
+        self.columns = columns
+        self.schema = pa.schema([pa.field(column, arrow_type, nullable=column in NULLABLE) for column, _, arrow_type in columns])
+        self.join = join
+        self.order = order
+        self.versions = versions
+
+    def statement(self, start: datetime, end: datetime):
+        return (
+            select(*(expression for _, expression, _ in self.columns))
+            .select_from(self.join)
+            .where(Match.match_date >= start, Match.match_date < end)
+            .order_by(*self.order)
+        )
+
+    def batch(self, rows) -> pa.RecordBatch:
+        values = list(zip(*rows))
+        arrays = []
+        for (column, _, arrow_type), column_values in zip(self.columns, values):
+            if column == "match_type":
+                codes = pa.array([MATCH_TYPE_CODES[MatchType(value)] for value in column_values], type=pa.int8())
+                arrays.append(pa.DictionaryArray.from_arrays(codes, MATCH_TYPE_DICTIONARY))
+            else:
+                arrays.append(pa.array(column_values, type=arrow_type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+RATINGS = Dataset(
+    "ratings",
+    [
+        ("id", Rating.id, pa.int32()),
+        ("match_id", Rating.match_id, pa.int32()),
+        ("user_id", Rating.user_id, pa.int32()),
+        ("rating", Rating.rating, pa.float32()),
+        ("created_at", Rating.created_at, pa.timestamp("us")),
+        ("updated_at", Rating.updated_at, pa.timestamp("us")),
+        ("event_id", Match.event_id, pa.int32()),
+        ("match_type", Match.match_type, MATCH_TYPE),
+        ("match_date", Match.match_date, pa.timestamp("us")),
+        ("title_match", Match.title_match, pa.int8()),
+        ("main_event", Match.main_event, pa.int8()),
+    ],
+    Rating.__table__.join(Match.__table__, Match.id == Rating.match_id),
+    (Match.match_date, Rating.match_id, Rating.id),
+    (
+        func.count(Rating.id),
+        func.max(func.coalesce(Rating.updated_at, Rating.created_at)),
+        func.max(func.coalesce(Match.updated_at, Match.created_at)),
+    ),
+)
+
+MATCH_RESULTS = Dataset(
+    "match_results",
+    [
+        ("match_id", MatchWrestler.match_id, pa.int32()),
+        ("wrestler_id", MatchWrestler.wrestler_id, pa.int32()),
+        ("is_winner", MatchWrestler.is_winner, pa.int8()),
+        ("team", MatchWrestler.team, pa.int8()),
+        ("event_id", Match.event_id, pa.int32()),
+        ("match_type", Match.match_type, MATCH_TYPE),
+        ("match_date", Match.match_date, pa.timestamp("us")),
+        ("duration", Match.duration, pa.int32()),
+        ("title_match", Match.title_match, pa.int8()),
+        ("main_event", Match.main_event, pa.int8()),
+    ],
+    MatchWrestler.__table__.join(Match.__table__, Match.id == MatchWrestler.match_id),
+    (Match.match_date, MatchWrestler.match_id, MatchWrestler.wrestler_id),
+    (
+        func.count(MatchWrestler.wrestler_id),
+        func.max(func.coalesce(Match.updated_at, Match.created_at)),
+    ),
+)
+
+DATASETS: Dict[str, Dataset] = {dataset.name: dataset for dataset in (RATINGS, MATCH_RESULTS)}
+
+
+def dataset_dir(name: str) -> str:
+    return os.path.join(settings.SNAPSHOT_DIR, name)
+
+
+def read_manifest(name: str) -> Optional[dict]:
+    """ manifest.json del último snapshot de `name`, o None si nunca se generó """
+    try:
+        with open(os.path.join(dataset_dir(name), "manifest.json")) as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+
+
+def write_atomic(path: str, write) -> None:
+    # Se escribe aparte y se renombra: quien descarga nunca ve un fichero a medias
+    temporary = f"{path}.tmp"
+    write(temporary)
+    os.replace(temporary, path)
+
+
+def partition_versions(db: Session, dataset: Dataset) -> Dict[str, list]:
+    """ {"AAAA-MM": [filas, fechas de cambio...]} con una sola consulta agregada """
+    year = extract("year", Match.match_date)
+    month = extract("month", Match.match_date)
+    statement = select(year, month, *dataset.versions).select_from(dataset.join).group_by(year, month)
+    return {
+        f"{int(row[0]):04d}-{int(row[1]):02d}": [value.isoformat() if isinstance(value, datetime) else value for value in row[2:]]
+        for row in db.connection().execute(statement)
+    }
+
+
+def partition_bounds(partition: str) -> Tuple[datetime, datetime]:
+    year, month = (int(part) for part in partition.split("-"))
+    start = datetime(year, month, 1)
+    return start, datetime(year + month // 12, month % 12 + 1, 1)
+
+
+def write_partition(db: Session, dataset: Dataset, partition: str, path: str, snapshot_format: str) -> int:
+    """ Escribe una partición leyendo con un cursor del servidor; cada bloque de
+    SNAPSHOT_BATCH_ROWS filas es un row group de Parquet o un lote de Arrow IPC """
+    statement = dataset.statement(*partition_bounds(partition)).execution_options(yield_per=settings.SNAPSHOT_BATCH_ROWS)
+    total = 0
+
+    def write(temporary: str):
+        nonlocal total
+        if snapshot_format == "parquet":
+            writer = pq.ParquetWriter(temporary, dataset.schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(temporary, dataset.schema)
+        with writer:
+            for rows in db.connection().execute(statement).partitions():
+                batch = dataset.batch(rows)
+                if snapshot_format == "parquet":
+                    writer.write_table(pa.Table.from_batches([batch]), row_group_size=len(batch))
+                else:
+                    writer.write_batch(batch)
+                total += len(batch)
+
+    write_atomic(path, write)
+    return total
+
+
+def export_snapshot(db: Session, name: str, snapshot_format: str = "arrow", full: bool = False) -> Dict[str, int]:
+    """ Actualiza el snapshot de `name` y devuelve las filas de cada partición reescrita.
+
+    Solo se reescriben las particiones cuyos agregados cambiaron desde el último
+    manifest (todas con `full` o si cambia el formato); las que ya no tienen filas se borran.
+    """
+    dataset = DATASETS[name]
+    extension, _ = SNAPSHOT_FORMATS[snapshot_format]
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        # Un snapshot completo puede durar más que DB_STATEMENT_TIMEOUT_MS
+        connection.execute(text(f"SET LOCAL statement_timeout = {int(settings.EXPORT_STATEMENT_TIMEOUT_MS)}"))
+
+    directory = dataset_dir(name)
+    os.makedirs(directory, exist_ok=True)
+
+    previous = read_manifest(name) or {}
+    known = previous.get("partitions", {}) if previous.get("format") == snapshot_format and not full else {}
+
+    versions = partition_versions(db, dataset)
+    partitions, written = {}, {}
+    for partition, version in sorted(versions.items()):
+        entry = known.get(partition)
+        if entry is None or entry["version"] != version:
+            rows = write_partition(db, dataset, partition, os.path.join(directory, f"{partition}.{extension}"), snapshot_format)
+            entry = {"file": f"{partition}.{extension}", "rows": rows, "version": version, "written_at": datetime.now(timezone.utc).isoformat()}
+            written[partition] = rows
+        partitions[partition] = entry
+
+    manifest = {
+        "dataset": name,
+        "format": snapshot_format,
+        "schema": [{"name": field.name, "type": str(field.type)} for field in dataset.schema],
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "partitions": partitions,
+    }
+
+    def write_manifest(temporary: str):
+        with open(temporary, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+    write_atomic(os.path.join(directory, "manifest.json"), write_manifest)
+
+    # Particiones sin filas y ficheros de otro formato
+    current = {entry["file"] for entry in partitions.values()} | {"manifest.json"}
+    for file_name in os.listdir(directory):
+        if file_name not in current:
+            os.remove(os.path.join(directory, file_name))
+
+    return written
@@ -0,0 +1,28 @@
+""" Genera los snapshots columnares de ratings y resultados de luchas (unidos a matches)
+en SNAPSHOT_DIR/<dataset>/, una partición por mes de match_date más manifest.json.
+
+Solo reescribe las particiones que cambiaron desde la ejecución anterior; --full las
+reescribe todas. Las descarga GET /ratings/snapshots/{dataset}/{partition}.
+
+Uso: python -m app.jobs.export_snapshot [--dataset ratings] [--format arrow|parquet] [--full]
+"""
+import argparse
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import sync_engine
+from app.db.snapshot import DATASETS, SNAPSHOT_FORMATS, export_snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", choices=sorted(DATASETS), action="append", help="por defecto, todos")
+    parser.add_argument("--format", choices=sorted(SNAPSHOT_FORMATS), default=settings.SNAPSHOT_FORMAT)
+    parser.add_argument("--full", action="store_true", help="reescribe todas las particiones")
+    args = parser.parse_args()
+
+    for name in args.dataset or DATASETS:
+        with Session(sync_engine) as session:
+            written = export_snapshot(session, name, args.format, full=args.full)
+        print(f"{name}: {len(written)} partitions written, {sum(written.values())} rows")
@@ -0,0 +1,74 @@
+""" Recalcula desde cero el power ranking (wrestler_power_rating y su historial)
+procesando todas las luchas en orden cronológico.
+
+Uso: python -m app.jobs.rebuild_rankings
+"""
+from collections import defaultdict
+
+from sqlmodel import Session, select, delete
+
+from app.core.config import settings
+from app.core.ranking import RatingStore, apply_match
+from app.core.timestamps import utcnow
+from app.db.models import Match, MatchWrestler, WrestlerPowerRating, WrestlerRatingHistory
+from app.db.session import sync_engine
+
+
+def rebuild_rankings(db: Session) -> int:
+
+    # Participantes de todas las luchas en una sola consulta
+    participants = defaultdict(list)
+    statement = select(MatchWrestler.match_id, MatchWrestler.wrestler_id, MatchWrestler.is_winner, MatchWrestler.team)
+    for match_id, wrestler_id, is_winner, team in db.exec(statement).all():
+        participants[match_id].append((wrestler_id, is_winner, team))
+
+    matches = db.exec(
+        select(Match.id, Match.match_type, Match.match_date).order_by(Match.match_date, Match.id)
+    ).all()
+
+    # Las luchas dependen del resultado de las anteriores, así que se aplican en
+    # orden; cada lucha se resuelve con operaciones vectorizadas sobre el store
+    store = RatingStore(settings.RANKING_INITIAL_RATING)
+    last_match = {}
+    history = []
+    for match_id, match_type, match_date in matches:
+        results = apply_match(store, match_type, participants.get(match_id, []), settings.RANKING_K_FACTOR)
+        for wrestler_id, rating, delta in results:
+            last_match[wrestler_id] = (match_id, match_date)
+            history.append({
+                "wrestler_id": wrestler_id,
+                "match_id": match_id,
+                "match_date": match_date,
+                "rating": rating,
+                "delta": delta,
+                "matches": int(store.matches[store.position(wrestler_id)])
+            })
+
+    now = utcnow()
+    ratings = [
+        {
+            "wrestler_id": wrestler_id,
+            "rating": rating,
+            "matches": played,
+            "last_match_id": last_match[wrestler_id][0],
+            "last_match_date": last_match[wrestler_id][1],
+            "updated_at": now
+        }
+        for wrestler_id, rating, played in store.items()
+    ]
+
+    db.exec(delete(WrestlerRatingHistory))
+    db.exec(delete(WrestlerPowerRating))
+    if history:
+        db.bulk_insert_mappings(WrestlerRatingHistory, history)
+    if ratings:
+        db.bulk_insert_mappings(WrestlerPowerRating, ratings)
+
+    db.commit()
+    return len(matches)
+
+
+if __name__ == "__main__":
+    with Session(sync_engine) as session:
+        total = rebuild_rankings(session)
+    print(f"Rebuilt power rankings from {total} matches")
@@ -0,0 +1,55 @@
+""" Recalcula desde cero match_rating_summary (y el ranking de /ratings/top) a partir
+de la tabla rating.
+
+Uso: python -m app.jobs.rebuild_rating_summaries
+"""
+
+from sqlmodel import Session, select, func
+
+from app.core.timestamps import utcnow
+from app.db.models import Match, Rating, MatchRatingSummary
+from app.db.rating_summary import HISTOGRAM_BUCKETS, new_summary, weighted_rating
+from app.db.session import sync_engine
+
+
+def rebuild_rating_summaries(db: Session) -> int:
+
+    # Una sola pasada agrupando por lucha y bucket de medio punto
+    bucket = func.round(Rating.rating * 2)
+    statement = (
+        select(Rating.match_id, bucket, func.count(Rating.id), func.sum(Rating.rating))
+        .group_by(Rating.match_id, bucket)
+    )
+
+    totals = {}
+    for match_id, bucket_value, count, rating_sum in db.exec(statement).all():
+        histogram, totals_count, totals_sum = totals.get(match_id, ([0] * HISTOGRAM_BUCKETS, 0, 0.0))
+        histogram[min(max(int(bucket_value), 0), HISTOGRAM_BUCKETS - 1)] += count
+        totals[match_id] = (histogram, totals_count + count, totals_sum + float(rating_sum))
+
+    now = utcnow()
+    existing = {summary.match_id: summary for summary in db.exec(select(MatchRatingSummary)).all()}
+    matches = db.exec(select(Match)).all()
+    for match in matches:
+        histogram, rating_count, rating_sum = totals.get(match.id, ([0] * HISTOGRAM_BUCKETS, 0, 0.0))
+        summary = existing.get(match.id) or new_summary(match)
+
+        summary.match_type = match.match_type.value
+        summary.event_id = match.event_id
+        summary.match_date = match.match_date
+        summary.rating_sum = rating_sum
+        summary.rating_count = rating_count
+        summary.average_rating = rating_sum / rating_count if rating_count else 0.0
+        summary.weighted_rating = weighted_rating(rating_sum, rating_count)
+        summary.histogram = histogram
+        summary.updated_at = now
+        db.add(summary)
+
+    db.commit()
+    return len(matches)
+
+
+if __name__ == "__main__":
+    with Session(sync_engine) as session:
+        total = rebuild_rating_summaries(session)
+    print(f"Rebuilt rating summaries for {total} matches")
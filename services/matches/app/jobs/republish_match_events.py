@@ -0,0 +1,34 @@
+""" Vuelve a publicar MatchCreated y MatchRatingChanged de todas las luchas para que el
+servicio wrestlers reconstruya sus estadísticas (el consumidor es idempotente).
+
+Uso: python -m app.jobs.republish_match_events
+"""
+from collections import defaultdict
+
+from sqlmodel import Session, select
+
+from app.db.models import Match, MatchWrestler, MatchRatingSummary
+from app.db.session import sync_engine
+from app.messaging.publisher import publish_events, match_created_event, match_rating_changed_event
+
+
+def match_events(db: Session):
+
+    participants = defaultdict(list)
+    statement = select(MatchWrestler.match_id, MatchWrestler.wrestler_id, MatchWrestler.is_winner, MatchWrestler.team)
+    for match_id, wrestler_id, is_winner, team in db.exec(statement).all():
+        participants[match_id].append((wrestler_id, is_winner, team))
+
+    summaries = {summary.match_id: summary for summary in db.exec(select(MatchRatingSummary)).all()}
+
+    for match in db.exec(select(Match).order_by(Match.id)).all():
+        yield "MatchCreated", match_created_event(match, participants.get(match.id, []))
+        summary = summaries.get(match.id)
+        if summary and summary.updated_at:
+            yield "MatchRatingChanged", match_rating_changed_event(summary)
+
+
+if __name__ == "__main__":
+    with Session(sync_engine) as session:
+        total = publish_events(match_events(session))
+    print(f"Published {total} match events")
@@ -3,18 +3,40 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import httpx 
-from sqlmodel import SQLModel, Session
+from contextlib import asynccontextmanager
+import asyncio
+import threading
 
-from app.api import matches, ratings
+from app.api import matches, ratings, rankings, imports
 from app.core.config import settings
-from app.db.session import engine, get_db 
+from app.core.http_client import http_client
+from app.core.cache import wrestler_cache, event_cache
+from app.core.jwt_verify import verifier, bearer_token, InvalidToken, KeysUnavailable
+from app.messaging.consumer import consume_catalog_events
+from app.messaging.publisher import publisher
+from app.db.session import create_db_and_tables, engine
 
-SQLModel.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await create_db_and_tables()
+
+    # Un único cliente HTTP con keep-alive para todas las llamadas a otros servicios
+    http_client.open()
+    publisher.start()
+
+    # Invalidación de la caché de luchadores cuando cambian en su servicio
+    thread = threading.Thread(target=consume_catalog_events, args=(asyncio.get_running_loop(),), daemon=True)
+    thread.start()
+    yield
+    publisher.stop()
+    await http_client.aclose()
+    await engine.dispose()
 
 app = FastAPI(
     title="WWE Rankings Matches Service",
     description="Servicio de gestión de luchas y rankings para la plataforma de rankings de WWE",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -22,27 +44,47 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"]
 )
 
 app.include_router(matches.router, prefix="/matches", tags=["matches"])
+app.include_router(imports.router, prefix="/matches", tags=["matches"])
 app.include_router(ratings.router, prefix="/ratings", tags=["ratings"])
+app.include_router(rankings.router, prefix="/rankings", tags=["rankings"])
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "service": "matches"}
 
-# Middleware para verificar la autenticación a través del servicio auth
+@app.get("/health/http-pool")
+def http_pool_stats():
+    return http_client.stats()
+
+@app.get("/health/publisher")
+def publisher_stats():
+    return publisher.stats()
+
+@app.get("/health/cache")
+async def cache_stats():
+    return {cache.name: cache.stats() for cache in (wrestler_cache, event_cache)}
+
+@app.get("/health/jwks")
+async def jwks_stats():
+    return verifier.stats()
+
+# Middleware que verifica localmente el JWT emitido por el servicio auth
 @app.middleware("http")
 async def verify_token(request, call_next):
-    if request.url.path == "/health":
+    if request.url.path.startswith("/health"):
         response = await call_next(request)
         return response 
     
     # Rutas públicas (para consultas de lectura)
     public_paths = [
         "/matches",
-        "/ratings/top"
+        "/ratings/top",
+        "/rankings"
     ]
 
     # Verificamos si la ruta y es pública y el método es GET
@@ -52,26 +94,23 @@ async def verify_token(request, call_next):
         return response
 
     # Verificamos los encabezados de la solicitud 
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
+    token = bearer_token(request.headers.get("Authorization"))
+    if not token:
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             content={"detail":"Not Authenticated"}
         )
 
-    # Verifica el token con el servicio de autenticación
+    # Firma y expiración se comprueban aquí, sin llamar al servicio auth
     try: 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.AUTH_SERVICE_URL}/users/me", headers={"Authorization": auth_header})
-
-            if response.status_code != 200:
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Invalid token"}
-                )
-                
-            
-    except httpx.RequestError:
+        request.state.principal = await verifier.verify(token)
+
+    except InvalidToken:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": "Invalid token"}
+        )
+    except KeysUnavailable:
         return JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"detail": "Auth service unavailable"}
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, Tuple
+
+from pika import BlockingConnection, ConnectionParameters
+from pika.exceptions import AMQPConnectionError
+
+from app.core.cache import AsyncTTLCache, wrestler_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CATALOG_EXCHANGE = 'catalog_events'
+
+# Evento -> (caché, campo del ID) a invalidar. El servicio events no modifica ni
+# borra eventos, así que no publica nada: event_cache caduca solo por EVENT_CACHE_TTL
+INVALIDATIONS = {
+    "WrestlerUpdated": (wrestler_cache, "wrestler_id"),
+    "WrestlerDeleted": (wrestler_cache, "wrestler_id"),
+}
+
+
+def invalidation(event) -> Optional[Tuple[AsyncTTLCache, int]]:
+    """ (caché, ID) que invalida un evento de catálogo; ValueError si está mal formado """
+    if not isinstance(event, dict):
+        raise ValueError("Catalog event must be an object")
+    target = INVALIDATIONS.get(event.get("event_name"))
+    if target is None:
+        return None
+    cache, field = target
+    data = event.get("data")
+    try:
+        return cache, int(data[field])
+    except (TypeError, KeyError, ValueError):
+        raise ValueError(f"Catalog event without {field}")
+
+
+def consume_catalog_events(loop: asyncio.AbstractEventLoop):
+    """ Escucha el exchange catalog_events en un hilo y pasa cada evento al event loop.
+
+    Cada instancia usa su propia cola exclusiva, así todas reciben todos los eventos.
+    """
+    while True:
+        try:
+            connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
+            channel = connection.channel()
+
+            channel.exchange_declare(exchange=CATALOG_EXCHANGE, exchange_type='fanout')
+            queue = channel.queue_declare(queue='', exclusive=True).method.queue
+            channel.queue_bind(exchange=CATALOG_EXCHANGE, queue=queue)
+
+            # Tras una reconexión pudimos perder invalidaciones: empezamos de cero
+            loop.call_soon_threadsafe(wrestler_cache.clear)
+
+            def callback(ch, method, properties, body):
+                try:
+                    target = invalidation(json.loads(body))
+                except ValueError:
+                    logger.warning("Discarding malformed catalog event: %r", body)
+                    return
+                # Las cachés no son thread-safe: la invalidación se hace en el event loop
+                if target is not None:
+                    cache, key = target
+                    loop.call_soon_threadsafe(cache.invalidate, key)
+
+            channel.basic_consume(queue=queue, on_message_callback=callback, auto_ack=True)
+            channel.start_consuming()
+        except AMQPConnectionError:
+            logger.warning("RabbitMQ unavailable, retrying in %ss", settings.CATALOG_EVENTS_RETRY_DELAY)
+        except Exception:
+            # El hilo no debe morir: las cachés se quedarían sin invalidaciones hasta reiniciar
+            logger.exception("catalog_events consumer failed, restarting in %ss", settings.CATALOG_EVENTS_RETRY_DELAY)
+        time.sleep(settings.CATALOG_EVENTS_RETRY_DELAY)
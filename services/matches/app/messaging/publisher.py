@@ -0,0 +1,207 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Iterable, Optional, Tuple
+
+from pika import BasicProperties, BlockingConnection, ConnectionParameters
+from pika.exceptions import AMQPError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MATCH_EVENTS_QUEUE = 'match_events'
+
+# Mensajes persistentes: las estadísticas de wrestlers dependen de ellos
+PERSISTENT = BasicProperties(delivery_mode=2, content_type='application/json')
+
+
+def event_body(event_name: str, data: dict) -> str:
+    return json.dumps({"event_name": event_name, "data": data}, default=str)
+
+
+class EventPublisher:
+    """ Publicador de larga vida para match_events.
+
+    Las peticiones solo encolan el evento en memoria (publish no bloquea ni falla);
+    un hilo mantiene la conexión con RabbitMQ, publica cada lote en una transacción
+    AMQP (una sola espera al broker por lote) y reconecta si el broker se cae. El lote
+    sale de pendientes solo tras tx_commit, así que tras una reconexión se reintenta.
+    Si el buffer se llena durante una caída larga, los eventos nuevos se descartan.
+    """
+
+    def __init__(self, queue_name: str, buffer_size: int, batch_size: int, batch_wait: float, retry_delay: float):
+        self.queue_name = queue_name
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retry_delay = retry_delay
+        self._buffer: "queue.Queue[str]" = queue.Queue(maxsize=buffer_size)
+        self._pending: "deque[str]" = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.connected = False
+        self.published = 0
+        self.dropped = 0
+        self.batches = 0
+        self.connection_errors = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="match-events-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """ Intenta vaciar el buffer antes de cerrar la conexión """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def publish(self, event_name: str, data: dict) -> bool:
+        try:
+            self._buffer.put_nowait(event_body(event_name, data))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Match events buffer full, dropping %s", event_name)
+            return False
+
+    def _run(self):
+        while not (self._stop.is_set() and self._idle()):
+            try:
+                self._serve()
+            except AMQPError:
+                self.connection_errors += 1
+                logger.warning("RabbitMQ unavailable, retrying in %ss", self.retry_delay)
+            except Exception:
+                # El hilo no debe morir: los eventos seguirían acumulándose sin publicarse
+                self.connection_errors += 1
+                logger.exception("Unexpected error publishing match events")
+            if self._stop.wait(self.retry_delay):
+                return
+
+    def _idle(self) -> bool:
+        return not self._pending and self._buffer.empty()
+
+    def _serve(self):
+        connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
+        try:
+            channel = connection.channel()
+            # Transacción en vez de publisher confirms: con confirm_delivery el
+            # BlockingChannel espera el ack de cada mensaje y el lote no ahorraría nada
+            channel.tx_select()
+            channel.queue_declare(queue=self.queue_name, durable=True)
+            self.connected = True
+
+            while not (self._stop.is_set() and self._idle()):
+                self._fill_batch(connection)
+                if not self._pending:
+                    continue
+                for body in self._pending:
+                    channel.basic_publish(exchange='', routing_key=self.queue_name, body=body, properties=PERSISTENT)
+                # El broker acepta el lote entero o nada: si la conexión cae antes, se reenvía
+                channel.tx_commit()
+                self.published += len(self._pending)
+                self.batches += 1
+                self._pending.clear()
+        finally:
+            self.connected = False
+            if connection.is_open:
+                connection.close()
+
+    def _fill_batch(self, connection: BlockingConnection):
+        """ Espera al primer evento y junta los que lleguen en batch_wait, hasta batch_size """
+        while not self._pending:
+            stopping = self._stop.is_set()
+            try:
+                self._pending.append(self._buffer.get_nowait() if stopping else self._buffer.get(timeout=0.5))
+            except queue.Empty:
+                if stopping:
+                    return
+                # Mantiene vivos los heartbeats mientras no hay nada que publicar
+                connection.process_data_events(time_limit=0)
+
+        deadline = time.monotonic() + self.batch_wait
+        while len(self._pending) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                self._pending.append(self._buffer.get(timeout=remaining) if remaining > 0 else self._buffer.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "buffered": self._buffer.qsize(),
+            "pending": len(self._pending),
+            "published": self.published,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "connection_errors": self.connection_errors,
+        }
+
+
+publisher = EventPublisher(
+    MATCH_EVENTS_QUEUE,
+    buffer_size=settings.MATCH_EVENTS_BUFFER_SIZE,
+    batch_size=settings.MATCH_EVENTS_BATCH_SIZE,
+    batch_wait=settings.MATCH_EVENTS_BATCH_WAIT,
+    retry_delay=settings.MATCH_EVENTS_RETRY_DELAY
+)
+
+
+def publish_events(events: Iterable[Tuple[str, dict]]) -> int:
+    """ Publica varios eventos (event_name, data) con una conexión propia y síncrona.
+
+    Para procesos sueltos como app.jobs.republish_match_events; el servicio usa `publisher`.
+    """
+    connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
+    try:
+        channel = connection.channel()
+        channel.queue_declare(queue=MATCH_EVENTS_QUEUE, durable=True)
+
+        published = 0
+        for event_name, data in events:
+            channel.basic_publish(exchange='', routing_key=MATCH_EVENTS_QUEUE, body=event_body(event_name, data), properties=PERSISTENT)
+            published += 1
+        return published
+    finally:
+        connection.close()
+
+
+def publish_event(event_name: str, data: dict) -> bool:
+    """ Encola el evento para el hilo publicador; nunca bloquea la petición.
+
+    Si el buffer se llena durante una caída larga de RabbitMQ, los eventos
+    descartados se recuperan con python -m app.jobs.republish_match_events.
+    """
+    return publisher.publish(event_name, data)
+
+
+def match_created_event(match, participants) -> dict:
+    return {
+        "match_id": match.id,
+        "event_id": match.event_id,
+        "match_type": match.match_type.value if match.match_type else None,
+        "match_date": match.match_date.isoformat(),
+        "results": [
+            {"wrestler_id": wrestler_id, "is_winner": is_winner, "team": team}
+            for wrestler_id, is_winner, team in participants
+        ]
+    }
+
+
+def match_rating_changed_event(summary) -> dict:
+    # Valores absolutos (no deltas): el consumidor descarta los que lleguen fuera de orden
+    return {
+        "match_id": summary.match_id,
+        "average_rating": summary.average_rating,
+        "rating_count": summary.rating_count,
+        "updated_at": summary.updated_at.isoformat() if summary.updated_at else None
+    }
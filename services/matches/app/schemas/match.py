@@ -1,6 +1,7 @@
 from pydantic import BaseModel 
 from typing import List, Optional, Dict, Any 
 from datetime import datetime 
+from app.core.timestamps import UtcDateTime
 from app.db.models import MatchType
 
 class WrestlerEntry(BaseModel):
@@ -13,7 +14,7 @@ class MatchBase(BaseModel):
     match_type: MatchType 
     title_match: int = 0
     duration: Optional[int] = None 
-    match_date: datetime
+    match_date: UtcDateTime
     description: Optional[str] = None 
     main_event: int = 0
 
@@ -26,7 +27,7 @@ class MatchUpdate(BaseModel):
     match_type: Optional[MatchType] = None
     title_match: Optional[int] = 0
     duration: Optional[int] = None 
-    match_date: Optional[datetime] = None
+    match_date: Optional[UtcDateTime] = None
     description: Optional[str] = None 
     main_event: Optional[int] = 0
     wrestlers: Optional[List[WrestlerEntry]] = None
@@ -39,10 +40,42 @@ class MatchRead(MatchBase):
     class Config:
         from_attributes = True 
         
+class WrestlerMatchHistory(BaseModel):
+    id: int
+    event_id: int
+    match_type: MatchType
+    title_match: int = 0
+    duration: Optional[int] = None
+    match_date: datetime
+    main_event: int = 0
+    team: int = 0
+    result: str # win, loss o draw (lucha sin ganadores)
+    average_rating: float = 0.0
+    rating_count: int = 0
+
+class EventCardWrestler(WrestlerEntry):
+    wrestler: Optional[Dict[str, Any]] = None
+
+class EventCardMatch(MatchRead):
+    wrestlers: List[EventCardWrestler]
+    average_rating: float = 0.0
+    rating_count: int = 0
+
+class EventCard(BaseModel):
+    event_id: int
+    matches: List[EventCardMatch]
+    # True si el servicio wrestlers no respondió a tiempo y faltan luchadores
+    partial: bool = False
+    unavailable: List[str] = []
+
 class MatchDetail(MatchRead):
     wrestlers: List[Dict[str, Any]]
     event: Optional[Dict[str, Any]] = None
     average_rating: float = 0.0
     rating_count: int = 0
+    rating_histogram: List[int] = [] # conteo por bucket de 0.5 puntos, de 0 a 5
+    # True si algún servicio no respondió a tiempo y faltan datos en la respuesta
+    partial: bool = False
+    unavailable: List[str] = []
 
 
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class WrestlerRanking(BaseModel):
+    position: int
+    wrestler_id: int
+    rating: float
+    matches: int
+    last_match_id: Optional[int] = None
+    last_match_date: Optional[datetime] = None
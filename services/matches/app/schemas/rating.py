@@ -35,6 +35,7 @@ class TopRatedMatch(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     average_rating: float
+    weighted_rating: float = 0.0 # promedio bayesiano usado para ordenar
     rating_count: int
     event: Optional[Dict[str, Any]] = None
     wrestlers: List[Dict[str, Any]] = None 
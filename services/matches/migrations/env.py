@@ -23,7 +23,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from app.db.models import Match, MatchWrestler, Rating
+from app.db.models import Match, MatchWrestler, Rating, MatchRatingSummary, WrestlerPowerRating, WrestlerRatingHistory
 from sqlmodel import SQLModel
 target_metadata = SQLModel.metadata
 
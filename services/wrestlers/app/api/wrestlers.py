@@ -1,19 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select 
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Request, Response
+from sqlalchemy import func, or_, text
+from sqlmodel import select 
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional 
 
-from app.db.session import get_db 
-from app.db.models import Wrestler, WrestlerStats
-from app.schemas.wrestler import WrestlerCreate, WrestlerRead, WrestlerWithStats, WrestlerUpdate
+from app.core.autocomplete import ring_names
+from app.core.conditional import Validators, page_validators, probe_page
+from app.core.config import settings
+from app.core.export import export_query, ndjson_response
+from app.core.fast_json import read_columns, rows_response
+from app.core.pagination import Keyset, paginate
+from app.core.timestamps import UtcDateTime
+from app.db.session import engine, get_db 
+from app.db.models import Wrestler, WrestlerStats, search_vector
+from app.messaging.publisher import publish_event
+from app.schemas.wrestler import WrestlerCreate, WrestlerRead, WrestlerWithStats, WrestlerUpdate, WrestlerBatch, WrestlerSuggestion
 
 router = APIRouter()
 
+WRESTLERS_KEYSET = Keyset(Wrestler.id)
+# Versión de cada fila para los ETag de los listados
+WRESTLER_VERSION_COLUMNS = (Wrestler.id, Wrestler.created_at, Wrestler.updated_at)
+# Listado con ?fast=true: filas con las columnas de WrestlerRead, en su orden
+WRESTLER_READ_FIELDS, WRESTLER_READ_COLUMNS = read_columns(WrestlerRead, Wrestler)
+
 @router.post("/", response_model=WrestlerRead)
-def create_wrestler(wrestler: WrestlerCreate, db: Session = Depends(get_db)):
+async def create_wrestler(wrestler: WrestlerCreate, db: AsyncSession = Depends(get_db)):
     
     # Validamos la existencia
     statement = select(Wrestler).where(Wrestler.ring_name == wrestler.ring_name)
-    existing_wrestler = db.exec(statement).first()
+    existing_wrestler = (await db.exec(statement)).first()
     if existing_wrestler:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,34 +39,167 @@ def create_wrestler(wrestler: WrestlerCreate, db: Session = Depends(get_db)):
     # Creamos el luchador
     new_wrestler = Wrestler(**wrestler.model_dump(exclude_unset=True))
     db.add(new_wrestler)
-    db.commit()
-    db.refresh(new_wrestler)
+    await db.commit()
+    await db.refresh(new_wrestler)
 
     # Creamos las estádisticas iniciales 
     stats = WrestlerStats(wrestler_id=new_wrestler.id)
     db.add(stats)
-    db.commit()
+    await db.commit()
+
+    ring_names.upsert(new_wrestler.id, new_wrestler.ring_name)
 
     return new_wrestler
 
     
 @router.get("/", response_model=List[WrestlerRead])
-def get_wrestlers(skip: int = 0, limit: int = 100, active: Optional[bool] = True, db: Session = Depends(get_db)):
+async def get_wrestlers(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    active: Optional[bool] = True,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    
+    query = select(Wrestler)
+    if active is not None:
+        query = query.where(Wrestler.active == active)
+
+    # La página sin cambios se valida leyendo solo ids y fechas
+    not_modified = await probe_page(db, request, query, WRESTLERS_KEYSET, "wrestlers", WRESTLER_VERSION_COLUMNS, limit, skip=skip, cursor=cursor)
+    if not_modified is not None:
+        return not_modified
+
+    if fast:
+        rows = await paginate(db, query, WRESTLERS_KEYSET, response, limit, skip=skip, cursor=cursor, columns=WRESTLER_READ_COLUMNS)
+        page_validators("wrestlers", rows, WRESTLER_VERSION_COLUMNS, response).apply(response)
+        return rows_response(rows, WRESTLER_READ_FIELDS, response)
+
+    wrestlers = await paginate(db, query, WRESTLERS_KEYSET, response, limit, skip=skip, cursor=cursor)
+    page_validators("wrestlers", wrestlers, WRESTLER_VERSION_COLUMNS, response).apply(response)
+
+    return [WrestlerRead.model_validate(w) for w in wrestlers]
+
+
+@router.get("/export")
+async def export_wrestlers(
+    updated_since: Optional[UtcDateTime] = None,
+    after_id: Optional[int] = None,
+    active: Optional[bool] = None
+):
+    """ Todos los luchadores (campos de WrestlerRead) en NDJSON, una línea por luchador """
+    
+    query = select(Wrestler).with_only_columns(*WRESTLER_READ_COLUMNS)
+    if active is not None:
+        query = query.where(Wrestler.active == active)
+
+    return await ndjson_response(export_query(query, Wrestler, updated_since, after_id), WRESTLER_READ_FIELDS)
+
+
+@router.get("/search", response_model=List[WrestlerRead])
+async def search_wrestlers(
+    q: str = Query(..., min_length=1),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db)
+):
     
     query = select(Wrestler)
     if active is not None:
         query = query.where(Wrestler.active == active)
 
-    statement = query.offset(skip).limit(limit)
-    wrestlers = db.exec(statement).all()
+    if engine.dialect.name == "postgresql":
+        # Texto completo sobre ring_name, name, from_city y bio (ix_wrestler_search) más
+        # similitud de trigramas en los nombres, que también encuentra nombres mal escritos
+        vector = search_vector()
+        terms = func.websearch_to_tsquery(text("'simple'"), q)
+        similarity = func.greatest(func.similarity(Wrestler.ring_name, q), func.similarity(Wrestler.name, q))
+        query = query.where(or_(vector.op("@@")(terms), Wrestler.ring_name.op("%")(q), Wrestler.name.op("%")(q)))
+        query = query.order_by((func.ts_rank(vector, terms) + similarity).desc(), Wrestler.id)
+    else:
+        pattern = f"%{q}%"
+        query = query.where(or_(*(column.ilike(pattern) for column in (Wrestler.ring_name, Wrestler.name, Wrestler.from_city, Wrestler.bio))))
+        query = query.order_by(Wrestler.ring_name, Wrestler.id)
+
+    # Resultados por relevancia: se pagina con skip
+    wrestlers = (await db.exec(query.offset(skip).limit(limit))).all()
 
     return [WrestlerRead.model_validate(w) for w in wrestlers]
 
 
+@router.get("/autocomplete", response_model=List[WrestlerSuggestion])
+async def autocomplete_wrestlers(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=settings.AUTOCOMPLETE_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
+):
+    
+    # Índice en memoria: solo se consulta la base de datos al (re)cargarlo
+    await ring_names.ensure_loaded(db)
+
+    return [WrestlerSuggestion(id=wrestler_id, ring_name=ring_name) for wrestler_id, ring_name in ring_names.search(q, limit)]
+
+
+@router.get("/batch", response_model=WrestlerBatch)
+async def get_wrestlers_batch(ids: str = Query(..., description="IDs separados por comas, p. ej. 1,2,3"), db: AsyncSession = Depends(get_db)):
+    
+    try:
+        wrestler_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma separated list of integers"
+        )
+
+    if len(wrestler_ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request"
+        )
+
+    # Luchadores y estadísticas en una sola consulta
+    statement = (
+        select(Wrestler, WrestlerStats)
+        .outerjoin(WrestlerStats, WrestlerStats.wrestler_id == Wrestler.id)
+        .where(Wrestler.id.in_(wrestler_ids))
+    )
+    found = {}
+    for wrestler, stats in (await db.exec(statement)).all():
+        if wrestler.id not in found:
+            found[wrestler.id] = WrestlerWithStats.model_validate({**wrestler.model_dump(), "stats": stats.model_dump() if stats else None})
+
+    return WrestlerBatch(
+        wrestlers=[found[i] for i in wrestler_ids if i in found],
+        missing=[i for i in wrestler_ids if i not in found]
+    )
+
+
 @router.get("/{wrestler_id}", response_model=WrestlerWithStats)
-def get_wrestler(wrestler_id: int, db: Session = Depends(get_db)):
+async def get_wrestler(wrestler_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     
-    wrestler = db.get(Wrestler, wrestler_id)
+    # Versión del luchador y de sus estadísticas, sin cargar las filas
+    statement = (
+        select(Wrestler.created_at, Wrestler.updated_at, WrestlerStats.created_at, WrestlerStats.updated_at)
+        .outerjoin(WrestlerStats, WrestlerStats.wrestler_id == Wrestler.id)
+        .where(Wrestler.id == wrestler_id)
+    )
+    version = (await db.exec(statement)).first()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wrestler not found"
+        )
+
+    validators = Validators.for_item("wrestler", wrestler_id, *version)
+    if validators.matches(request):
+        return validators.not_modified()
+    validators.apply(response)
+
+    wrestler = await db.get(Wrestler, wrestler_id)
     if not wrestler:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -58,14 +207,19 @@ def get_wrestler(wrestler_id: int, db: Session = Depends(get_db)):
         )
 
     statement = select(WrestlerStats).where(WrestlerStats.wrestler_id == wrestler_id)
-    stats = db.exec(statement).first()
+    stats = (await db.exec(statement)).first()
 
     return WrestlerWithStats.model_validate({**wrestler.model_dump(), "stats": stats.model_dump() if stats else None})
 
 @router.put("/{wrestler_id}", response_model=WrestlerRead)
-def update_wrestler(wrestler_id: int, wrestler_update: WrestlerUpdate, db: Session = Depends(get_db)):
+async def update_wrestler(
+    wrestler_id: int,
+    wrestler_update: WrestlerUpdate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     
-    db_wrestler = db.get(Wrestler, wrestler_id)
+    db_wrestler = await db.get(Wrestler, wrestler_id)
     if not db_wrestler:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wrestler not found")
 
@@ -74,14 +228,18 @@ def update_wrestler(wrestler_id: int, wrestler_update: WrestlerUpdate, db: Sessi
     for key, value in wrestler_data.items():
         setattr(db_wrestler, key, value)
 
-    db.commit()
-    db.refresh(db_wrestler)
+    await db.commit()
+    await db.refresh(db_wrestler)
+    ring_names.upsert(db_wrestler.id, db_wrestler.ring_name)
+
+    # Otros servicios (matches) cachean luchadores: avisamos del cambio
+    background_tasks.add_task(publish_event, "WrestlerUpdated", {"wrestler_id": wrestler_id})
     return WrestlerRead.model_validate(db_wrestler)
 
 @router.delete("/{wrestler_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_wrestler(wrestler_id: int, db: Session = Depends(get_db)):
+async def delete_wrestler(wrestler_id: int, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
 
-    db_wrestler = db.get(Wrestler, wrestler_id)
+    db_wrestler = await db.get(Wrestler, wrestler_id)
 
     if not db_wrestler:
         raise HTTPException(
@@ -89,7 +247,10 @@ def delete_wrestler(wrestler_id: int, db: Session = Depends(get_db)):
             detail="Wrestler not found"
         )
 
-    db.delete(db_wrestler)
-    db.commit()
+    await db.delete(db_wrestler)
+    await db.commit()
+    ring_names.remove(wrestler_id)
+
+    background_tasks.add_task(publish_event, "WrestlerDeleted", {"wrestler_id": wrestler_id})
 
     return None
\ No newline at end of file
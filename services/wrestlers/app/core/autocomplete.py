@@ -0,0 +1,112 @@
+import asyncio
+import bisect
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import select
+
+from app.core.config import settings
+from app.db.models import Wrestler
+
+
+def normalize(text: str) -> str:
+    """ Minúsculas y sin acentos: "Rey Místerio" -> "rey misterio" """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+class RingNameIndex:
+    """ Índice ordenado en memoria de ring names para el autocompletado.
+
+    Cada luchador aparece una vez por palabra de su ring name ("rey mysterio" y
+    "mysterio"), así que un prefijo encuentra tanto el inicio del nombre como el de
+    cualquier palabra. La búsqueda es un bisect sobre la lista ordenada, sin tocar la
+    base de datos. Las escrituras de este worker lo actualizan al momento; lo que
+    cambien otros workers llega al recargarlo completo cada `max_age` segundos.
+    Se usa desde el event loop; no es thread-safe.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._keys: List[Tuple[str, int]] = []
+        self._ring_names: Dict[int, str] = {}
+        self._lock = asyncio.Lock()
+        self.loaded_at: Optional[float] = None
+
+        self.lookups = 0
+        self.reloads = 0
+
+    def _entries(self, wrestler_id: int, ring_name: str) -> List[Tuple[str, int]]:
+        words = normalize(ring_name).split(" ")
+        return list(dict.fromkeys((" ".join(words[i:]), wrestler_id) for i in range(len(words)) if words[i]))
+
+    async def ensure_loaded(self, db):
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_age:
+            return
+        async with self._lock:
+            # Otra petición pudo recargarlo mientras esperábamos el lock
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_age:
+                return
+            rows = (await db.exec(select(Wrestler.id, Wrestler.ring_name))).all()
+            self.load(rows)
+
+    def load(self, rows):
+        keys = []
+        ring_names = {}
+        for wrestler_id, ring_name in rows:
+            ring_names[wrestler_id] = ring_name
+            keys.extend(self._entries(wrestler_id, ring_name))
+        keys.sort()
+
+        self._keys = keys
+        self._ring_names = ring_names
+        self.loaded_at = time.monotonic()
+        self.reloads += 1
+
+    def upsert(self, wrestler_id: int, ring_name: str):
+        if self.loaded_at is None:
+            return
+        self.remove(wrestler_id)
+        self._ring_names[wrestler_id] = ring_name
+        for key in self._entries(wrestler_id, ring_name):
+            bisect.insort(self._keys, key)
+
+    def remove(self, wrestler_id: int):
+        ring_name = self._ring_names.pop(wrestler_id, None)
+        if ring_name is None:
+            return
+        for key in self._entries(wrestler_id, ring_name):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        """ (id, ring_name) cuyo ring name o alguna de sus palabras empieza por `prefix` """
+        self.lookups += 1
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        found: Dict[int, str] = {}
+        position = bisect.bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and len(found) < limit:
+            key, wrestler_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(wrestler_id, self._ring_names[wrestler_id])
+            position += 1
+        return list(found.items())
+
+    def stats(self) -> dict:
+        return {
+            "wrestlers": len(self._ring_names),
+            "keys": len(self._keys),
+            "max_age": self.max_age,
+            "age": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at is not None else None,
+            "lookups": self.lookups,
+            "reloads": self.reloads,
+        }
+
+
+ring_names = RingNameIndex(settings.AUTOCOMPLETE_MAX_AGE)
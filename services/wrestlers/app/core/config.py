@@ -1,5 +1,6 @@
 import os 
 from pydantic_settings import BaseSettings
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,6 +10,50 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     DATABASE_URI: str = os.getenv("DATABASE_URI")
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8000")
+    RABBITMQ_HOST: str = os.getenv("RABBITMQ_HOST", "localhost")
+    RABBITMQ_PORT: int = 5672
+
+    # Máximo de luchadores por consulta en /wrestlers/batch
+    BATCH_MAX_IDS: int = 200
+
+    # Búsqueda (/wrestlers/search) y autocompletado (/wrestlers/autocomplete)
+    SEARCH_MAX_LIMIT: int = 50
+    AUTOCOMPLETE_MAX_LIMIT: int = 20
+    AUTOCOMPLETE_MAX_AGE: float = 60.0 # segundos hasta recargar el índice (cambios de otros workers)
+
+    # Consumo por lotes de los eventos de luchas (cola match_events)
+    MATCH_EVENTS_BATCH_SIZE: int = 100
+    MATCH_EVENTS_BATCH_WAIT: float = 1.0 # segundos máximos que espera un lote incompleto
+    MATCH_EVENTS_RETRY_DELAY: float = 5.0
+    MATCH_EVENTS_MAX_ATTEMPTS: int = 5 # después se aparta a la cola de fallidos
+    MATCH_EVENTS_DEAD_LETTER_QUEUE: str = "match_events.failed"
+
+    # Tokens de logins recientes (auth_events), hasta su expiración
+    TOKEN_CACHE_SIZE: int = 100000
+    TOKEN_CACHE_DEFAULT_TTL: float = 3600.0 # si el evento y el token no traen exp
+    TOKEN_CACHE_PURGE_INTERVAL: float = 60.0
+    # SQLite compartido por los workers del host y persistente entre reinicios (vacío: solo memoria).
+    # El directorio se crea con permisos 0700 y el fichero con 0600
+    TOKEN_STORE_PATH: str = os.getenv("TOKEN_STORE_PATH", os.path.expanduser("~/.wrestlers/tokens.sqlite3"))
+
+    # Descargas NDJSON (/export): filas por lectura del cursor del servidor
+    EXPORT_CHUNK_SIZE: int = 1000
+    EXPORT_STATEMENT_TIMEOUT_MS: int = 0 # sin límite durante una descarga
+
+    # Pool de conexiones a la base de datos
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800 # segundos
+    DB_STATEMENT_TIMEOUT_MS: int = 15000 # 0 para desactivarlo
+    DB_ECHO: bool = True
+
+    # Verificación local de los JWT de auth con sus claves públicas (/auth/jwks)
+    JWT_JWKS_TTL: float = 3600.0
+    JWT_JWKS_MIN_REFRESH: float = 30.0 # segundos entre recargas forzadas por un kid desconocido
+    JWT_JWKS_TIMEOUT: float = 2.0
+    # Secreto compartido con auth para sus tokens HS256 (si auth no firma con RSA)
+    JWT_SECRET_KEY: Optional[str] = os.getenv("JWT_SECRET_KEY")
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,27 @@
+from typing import Any, Dict, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def read_columns(schema: Type[BaseModel], model, **overrides: Any) -> Tuple[Tuple[str, ...], list]:
+    """ Campos de `schema` en su orden y las columnas de `model` que los llenan.
+
+    `overrides` sustituye la columna de un campo, p. ej. un cast cuando el tipo de la
+    columna no es el del esquema (Pydantic lo convertiría en el camino normal).
+    """
+    fields = tuple(schema.model_fields)
+    return fields, [overrides[field] if field in overrides else getattr(model, field) for field in fields]
+
+
+def rows_response(rows, fields: Tuple[str, ...], response: Response) -> Response:
+    """ Lista JSON codificada con orjson a partir de filas, sin crear modelos de Pydantic.
+
+    Para los tipos de los listados (str, int, float, bool, Enum, date y datetime sin
+    zona horaria) produce los mismos bytes que model_validate + response_model +
+    JSONResponse. Conserva las cabeceras ya puestas en `response` (cursor, ETag).
+    """
+    body = orjson.dumps([dict(zip(fields, row)) for row in rows])
+    headers: Dict[str, str] = dict(response.headers)
+    return Response(content=body, media_type="application/json", headers=headers)
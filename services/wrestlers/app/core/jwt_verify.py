@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException, Request, status
+from jose import JWTError, jwk, jwt
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RSA_ALGORITHM = "RS256"
+HMAC_ALGORITHM = "HS256"
+
+
+class Principal(BaseModel):
+    """ Usuario autenticado según los claims del token """
+    email: str
+    user_id: Optional[int] = None
+    expires_at: Optional[int] = None
+
+
+class InvalidToken(Exception):
+    """ Token mal formado, con firma incorrecta, caducado o de una clave desconocida """
+
+
+class KeysUnavailable(Exception):
+    """ No hay claves públicas de auth con las que verificar """
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+class JWTVerifier:
+    """ Verifica localmente los JWT emitidos por el servicio auth.
+
+    Las claves públicas se descargan de /auth/jwks y se guardan JWT_JWKS_TTL segundos.
+    Un `kid` desconocido (rotación de claves) fuerza una recarga, como mucho una vez
+    cada JWT_JWKS_MIN_REFRESH segundos. Si auth no responde se siguen usando las
+    claves que ya teníamos. Los tokens HS256 solo se aceptan con JWT_SECRET_KEY.
+    """
+
+    def __init__(self, jwks_url: str, secret_key: Optional[str] = None):
+        self.jwks_url = jwks_url
+        self.secret_key = secret_key
+        self._keys: Dict[str, object] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+        self.verified = 0
+        self.rejected = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= settings.JWT_JWKS_TTL
+
+    async def _refresh(self, kid: str):
+        async with self._lock:
+            # Otra petición pudo recargar las claves mientras esperábamos
+            if kid in self._keys and not self._stale():
+                return
+            now = time.monotonic()
+            if self._attempted_at is not None and now - self._attempted_at < settings.JWT_JWKS_MIN_REFRESH:
+                return
+            self._attempted_at = now
+
+            try:
+                async with httpx.AsyncClient(timeout=settings.JWT_JWKS_TIMEOUT) as client:
+                    response = await client.get(self.jwks_url)
+                    response.raise_for_status()
+                    keys = {key["kid"]: jwk.construct(key, RSA_ALGORITHM) for key in response.json()["keys"]}
+            except (httpx.HTTPError, JWTError, ValueError, KeyError, TypeError):
+                self.refresh_errors += 1
+                logger.warning("Could not fetch JWKS from %s", self.jwks_url, exc_info=True)
+                return
+
+            self._keys = keys
+            self._fetched_at = now
+            self.refreshes += 1
+
+    async def _public_key(self, kid: Optional[str]):
+        if kid is None:
+            raise InvalidToken("Missing key id")
+        if kid not in self._keys or self._stale():
+            await self._refresh(kid)
+        if not self._keys:
+            raise KeysUnavailable()
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise InvalidToken("Unknown key id")
+        return key
+
+    async def verify(self, token: str) -> Principal:
+        try:
+            header = jwt.get_unverified_header(token)
+            algorithm = header.get("alg")
+            if algorithm == RSA_ALGORITHM:
+                key = await self._public_key(header.get("kid"))
+            elif algorithm == HMAC_ALGORITHM and self.secret_key:
+                key = self.secret_key
+            else:
+                raise InvalidToken(f"Unsupported algorithm {algorithm}")
+
+            claims = jwt.decode(token, key, algorithms=[algorithm])
+            if not claims.get("sub"):
+                raise InvalidToken("Missing subject")
+        except JWTError as exc:
+            self.rejected += 1
+            raise InvalidToken(str(exc)) from exc
+        except InvalidToken:
+            self.rejected += 1
+            raise
+
+        self.verified += 1
+        return Principal(email=claims["sub"], user_id=claims.get("uid"), expires_at=claims.get("exp"))
+
+    def stats(self) -> dict:
+        return {
+            "keys": sorted(self._keys),
+            "age": round(time.monotonic() - self._fetched_at, 1) if self._fetched_at is not None else None,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+verifier = JWTVerifier(f"{settings.AUTH_SERVICE_URL}/auth/jwks", settings.JWT_SECRET_KEY)
+
+
+def get_principal(request: Request) -> Principal:
+    """ Dependencia: usuario verificado por el middleware (con su ID) """
+    principal = getattr(request.state, "principal", None)
+    if principal is None or principal.user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+    return principal
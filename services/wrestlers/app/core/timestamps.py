@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from typing import Annotated, Optional
+
+from pydantic import AfterValidator
+
+
+def utcnow() -> datetime:
+    """ Fecha actual en UTC sin zona horaria.
+
+    Las columnas son TIMESTAMP WITHOUT TIME ZONE y asyncpg no acepta fechas con zona
+    para ellas (psycopg2 sí las aceptaba).
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """ Pasa a UTC sin zona una fecha con zona; las que no la tienen ya son UTC """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Fecha recibida del cliente (cuerpo o query), normalizada antes de llegar a una consulta
+UtcDateTime = Annotated[datetime, AfterValidator(naive_utc)]
@@ -0,0 +1,153 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.token_store import TokenStore, open_token_store, token_digest
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """ Claim exp del token sin verificar la firma (solo para saber cuándo caducarlo) """
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+    return float(exp) if exp is not None else None
+
+
+class TokenCache:
+    """ Tokens de logins recientes (evento UserLoggedIn) -> email, hasta que caducan.
+
+    Un heap ordenado por expiración permite descartar los caducados en cada escritura
+    sin recorrer todo el diccionario; si se alcanza `maxsize` se expulsa el que antes
+    caduca. Escribe el hilo consumidor de RabbitMQ (con lock) y lee el middleware desde
+    el event loop sin lock: una lectura es un dict.get atómico más una comparación.
+
+    Con `store` cada token se escribe también en un TokenStore compartido por los
+    workers del host, que se consulta solo cuando el token no está en memoria. Las
+    claves son el sha256 del token, en memoria y en el store.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float, store: Optional[TokenStore] = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.store = store
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._expiries: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[str]:
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is not None and entry[1] > time.time():
+            self.hits += 1
+            return entry[0]
+
+        # Token recibido por otro worker (o antes de reiniciar): lo traemos a memoria
+        if self.store is not None:
+            stored = self.store.get(digest)
+            if stored is not None:
+                self.store_hits += 1
+                self._insert(digest, *stored)
+                return stored[0]
+
+        self.misses += 1
+        return None
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) is not None
+
+    def add(self, token: str, email: str, expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = token_expiry(token) or time.time() + self.default_ttl
+
+        digest = token_digest(token)
+        if self.store is not None:
+            self.store.add(digest, email, expires_at)
+        self._insert(digest, email, expires_at)
+
+    def _insert(self, digest: str, email: str, expires_at: float):
+        with self._lock:
+            now = time.time()
+            self._purge(now)
+            if expires_at <= now:
+                return
+
+            self._entries[digest] = (email, expires_at)
+            heapq.heappush(self._expiries, (expires_at, digest))
+            while len(self._entries) > self.maxsize:
+                self._pop_earliest()
+                self.evictions += 1
+
+    def _pop_earliest(self):
+        while self._expiries:
+            expires_at, digest = heapq.heappop(self._expiries)
+            entry = self._entries.get(digest)
+            # Entradas del heap que ya no corresponden (token re-añadido con otra expiración)
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[digest]
+                return
+
+    def _purge(self, now: float):
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, digest = heapq.heappop(self._expiries)
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[digest]
+                self.expirations += 1
+
+        # Sin compactar, las entradas obsoletas del heap crecerían con los re-logins
+        if len(self._expiries) > 2 * len(self._entries) + 1024:
+            self._expiries = [(expires_at, digest) for digest, (_, expires_at) in self._entries.items()]
+            heapq.heapify(self._expiries)
+
+    def purge(self):
+        with self._lock:
+            self._purge(time.time())
+        if self.store is not None:
+            self.store.purge()
+
+    def warm(self) -> int:
+        """ Recarga desde el TokenStore los tokens vigentes (arranque del worker) """
+        if self.store is None:
+            return 0
+        rows = self.store.load(self.maxsize)
+        for digest, email, expires_at in rows:
+            self._insert(digest, email, expires_at)
+        return len(rows)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.store_hits + self.misses
+        stats = {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "heap_size": len(self._expiries),
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
+        if self.store is not None:
+            stats["store"] = {"path": self.store.path, "size": len(self.store), "errors": self.store.errors}
+        return stats
+
+
+token_cache = TokenCache(
+    settings.TOKEN_CACHE_SIZE,
+    settings.TOKEN_CACHE_DEFAULT_TTL,
+    store=open_token_store(settings.TOKEN_STORE_PATH)
+)
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(token: str) -> str:
+    """ Clave de un token en la caché y en el store: nunca se guarda el token en claro """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def secure_path(path: str):
+    """ Crea el directorio (0700) y el fichero (0600) del store.
+
+    Lo que hay en el store se acepta como sesión válida sin verificar la firma, así
+    que se rechazan un directorio o un fichero de otro usuario y los enlaces simbólicos.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.lstat(directory).st_uid != os.getuid():
+        raise PermissionError(f"Token store directory {directory} is not owned by this user")
+    os.chmod(directory, 0o700)
+
+    descriptor = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        if os.fstat(descriptor).st_uid != os.getuid():
+            raise PermissionError(f"Token store {path} is not owned by this user")
+        os.fchmod(descriptor, 0o600)
+    finally:
+        os.close(descriptor)
+
+
+class TokenStore:
+    """ Copia en SQLite (modo WAL) de los tokens de TokenCache, compartida por todos los
+    workers del host y persistente entre reinicios.
+
+    Con varios workers de uvicorn cada uno consume solo una parte de auth_events, así
+    que un token puede haber llegado a otro proceso: en un fallo de la caché en memoria
+    se consulta aquí. Al arrancar, warm() recarga los tokens vigentes sin esperar a
+    nuevos logins. Cada hilo usa su propia conexión; WAL permite leer mientras el
+    consumidor escribe. Los errores de SQLite se registran y cuentan como fallo de caché.
+
+    Los tokens se guardan como sha256 (token_digest): quien lea el fichero no obtiene
+    sesiones utilizables.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.errors = 0
+        secure_path(path)
+        # Versiones anteriores guardaban los tokens en claro
+        self._connection().execute("DROP TABLE IF EXISTS tokens")
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS token_digests ("
+            " digest TEXT PRIMARY KEY,"
+            " email TEXT NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection().execute("CREATE INDEX IF NOT EXISTS ix_token_digests_expires_at ON token_digests (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit: cada escritura es una transacción corta
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, digest: str) -> Optional[Tuple[str, float]]:
+        try:
+            return self._connection().execute(
+                "SELECT email, expires_at FROM token_digests WHERE digest = ? AND expires_at > ?",
+                (digest, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            logger.exception("Could not read token store %s", self.path)
+            return None
+
+    def add(self, digest: str, email: str, expires_at: float):
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO token_digests (digest, email, expires_at) VALUES (?, ?, ?)",
+                (digest, email, expires_at)
+            )
+        except sqlite3.Error:
+            self.errors += 1
+            logger.exception("Could not write token store %s", self.path)
+
+    def purge(self) -> int:
+        try:
+            return self._connection().execute("DELETE FROM token_digests WHERE expires_at <= ?", (time.time(),)).rowcount
+        except sqlite3.Error:
+            self.errors += 1
+            logger.exception("Could not purge token store %s", self.path)
+            return 0
+
+    def load(self, limit: int) -> List[Tuple[str, str, float]]:
+        """ (digest, email, expires_at) vigentes, primero los que más tardan en caducar """
+        try:
+            return self._connection().execute(
+                "SELECT digest, email, expires_at FROM token_digests WHERE expires_at > ? ORDER BY expires_at DESC LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        except sqlite3.Error:
+            self.errors += 1
+            logger.exception("Could not load token store %s", self.path)
+            return []
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT count(*) FROM token_digests").fetchone()[0]
+        except sqlite3.Error:
+            self.errors += 1
+            return 0
+
+
+def open_token_store(path: str) -> Optional[TokenStore]:
+    """ TokenStore en `path`, o None (solo caché en memoria) si no hay ruta o no es segura """
+    if not path:
+        return None
+    try:
+        return TokenStore(path)
+    except (OSError, sqlite3.Error):
+        logger.exception("Token store %s disabled", path)
+        return None
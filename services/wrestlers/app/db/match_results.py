@@ -0,0 +1,199 @@
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from app.core.timestamps import utcnow
+from app.db.models import WrestlerMatchResult, WrestlerStats
+
+WIN = "win"
+LOSS = "loss"
+DRAW = "draw"
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """ Fechas de los eventos como UTC sin zona, igual que se guardan en la base de datos """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _int_field(value, field: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {field}: {value!r}")
+
+
+def parse_match_event(body: bytes) -> Tuple[str, dict]:
+    """ (nombre, datos) de un mensaje de match_events, validado antes de entrar en un lote.
+
+    Lanza ValueError si falta o no tiene el tipo esperado algún campo que usa
+    apply_match_events, para que un mensaje mal formado no haga fallar el lote entero.
+    """
+    event = json.loads(body)
+    if not isinstance(event, dict) or not isinstance(event.get("event_name"), str) or not isinstance(event.get("data"), dict):
+        raise ValueError("Event without event_name or data")
+
+    name, data = event["event_name"], dict(event["data"])
+    data["match_id"] = _int_field(data.get("match_id"), "match_id")
+    try:
+        if name == "MatchCreated":
+            results = data.get("results") or []
+            if not isinstance(results, list) or not all(isinstance(entry, dict) for entry in results):
+                raise ValueError("results must be a list of objects")
+            data["results"] = [
+                {**entry, "wrestler_id": _int_field(entry.get("wrestler_id"), "wrestler_id"), "is_winner": _int_field(entry.get("is_winner") or 0, "is_winner")}
+                for entry in results
+            ]
+            parse_datetime(data.get("match_date"))
+        elif name == "MatchRatingChanged":
+            data["average_rating"] = float(data.get("average_rating") or 0.0)
+            data["rating_count"] = _int_field(data.get("rating_count") or 0, "rating_count")
+            parse_datetime(data.get("updated_at"))
+    except TypeError as error:
+        raise ValueError(str(error))
+    return name, data
+
+
+def match_results(results: Iterable[dict]) -> Dict[int, str]:
+    """ Resultado de cada luchador; una lucha sin ganadores cuenta como empate """
+    results = list(results)
+    has_winner = any(entry.get("is_winner") for entry in results)
+    return {
+        entry["wrestler_id"]: (WIN if entry.get("is_winner") else LOSS) if has_winner else DRAW
+        for entry in results
+    }
+
+
+def update_stats(stats: WrestlerStats, row: WrestlerMatchResult, sign: int):
+    """ Suma (sign=1) o resta (sign=-1) la aportación de una fila del ledger a las estadísticas """
+    if row.result == WIN:
+        stats.wins += sign
+    elif row.result == LOSS:
+        stats.losses += sign
+    else:
+        stats.draws += sign
+    stats.total_matches += sign
+
+    if row.rating_count:
+        stats.rated_matches += sign
+        stats.match_rating_sum += sign * row.match_rating
+
+
+def apply_match_events(db: Session, events: Iterable[Tuple[str, dict]]) -> Set[int]:
+    """ Aplica un lote de eventos del servicio matches; devuelve los luchadores afectados.
+
+    Cada evento trae valores absolutos (participantes y resultado, o el promedio actual
+    de la lucha), así que repetirlo no cambia nada: el ledger wrestler_match_result
+    guarda lo ya aplicado y las estadísticas solo se mueven por la diferencia.
+    No hace commit.
+    """
+    events = [(name, data) for name, data in events if name in ("MatchCreated", "MatchRatingChanged")]
+    if not events:
+        return set()
+
+    match_ids = {data["match_id"] for _, data in events}
+    ledger = defaultdict(dict)
+    statement = select(WrestlerMatchResult).where(WrestlerMatchResult.match_id.in_(match_ids)).with_for_update()
+    for row in db.exec(statement).all():
+        ledger[row.match_id][row.wrestler_id] = row
+
+    wrestler_ids = {row.wrestler_id for rows in ledger.values() for row in rows.values()}
+    for name, data in events:
+        if name == "MatchCreated":
+            wrestler_ids.update(entry["wrestler_id"] for entry in data.get("results", []))
+
+    statement = select(WrestlerStats).where(WrestlerStats.wrestler_id.in_(wrestler_ids)).with_for_update()
+    stats = {row.wrestler_id: row for row in db.exec(statement).all()}
+
+    affected = set()
+    for name, data in events:
+        rows = ledger[data["match_id"]]
+        if name == "MatchCreated":
+            affected |= _apply_results(db, data, rows, stats)
+        else:
+            affected |= _apply_rating(db, data, rows, stats)
+
+    now = utcnow()
+    for wrestler_id in affected:
+        wrestler_stats = stats[wrestler_id]
+        wrestler_stats.average_match_rating = (
+            wrestler_stats.match_rating_sum / wrestler_stats.rated_matches if wrestler_stats.rated_matches else 0.0
+        )
+        wrestler_stats.updated_at = now
+        db.add(wrestler_stats)
+
+    return affected
+
+
+def _apply_results(db: Session, data: dict, rows: Dict[int, WrestlerMatchResult], stats: Dict[int, WrestlerStats]) -> Set[int]:
+    results = match_results(data.get("results", []))
+    match_date = parse_datetime(data.get("match_date"))
+    affected = set()
+
+    # Participantes que ya no están en la lucha
+    for wrestler_id in [w for w in rows if w not in results]:
+        row = rows.pop(wrestler_id)
+        if wrestler_id in stats:
+            update_stats(stats[wrestler_id], row, -1)
+            affected.add(wrestler_id)
+        db.delete(row)
+
+    # El rating de la lucha es común a todos sus participantes
+    current = next(iter(rows.values()), None)
+
+    for wrestler_id, result in results.items():
+        if wrestler_id not in stats:
+            # Luchador eliminado (o sin estadísticas): no hay nada que actualizar
+            continue
+
+        row = rows.get(wrestler_id)
+        if row is None:
+            row = WrestlerMatchResult(wrestler_id=wrestler_id, match_id=data["match_id"], result=result, match_date=match_date)
+            if current is not None:
+                row.match_rating = current.match_rating
+                row.rating_count = current.rating_count
+                row.rating_updated_at = current.rating_updated_at
+            rows[wrestler_id] = row
+        elif row.result != result or row.match_date != match_date:
+            update_stats(stats[wrestler_id], row, -1)
+            row.result = result
+            row.match_date = match_date
+        else:
+            continue
+
+        update_stats(stats[wrestler_id], row, 1)
+        db.add(row)
+        affected.add(wrestler_id)
+
+    return affected
+
+
+def _apply_rating(db: Session, data: dict, rows: Dict[int, WrestlerMatchResult], stats: Dict[int, WrestlerStats]) -> Set[int]:
+    updated_at = parse_datetime(data.get("updated_at"))
+    affected = set()
+
+    for wrestler_id, row in rows.items():
+        if wrestler_id not in stats:
+            continue
+
+        # Descartamos eventos más antiguos que el ya aplicado
+        if row.rating_updated_at and updated_at and updated_at <= row.rating_updated_at:
+            continue
+
+        update_stats(stats[wrestler_id], row, -1)
+        row.match_rating = data.get("average_rating") or 0.0
+        row.rating_count = data.get("rating_count") or 0
+        row.rating_updated_at = updated_at
+        update_stats(stats[wrestler_id], row, 1)
+
+        db.add(row)
+        affected.add(wrestler_id)
+
+    return affected
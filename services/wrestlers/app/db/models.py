@@ -1,10 +1,16 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
-from datetime import date, datetime, timezone
-from sqlalchemy import Column, ForeignKey
+from datetime import date, datetime
+from app.core.timestamps import utcnow
+from sqlalchemy import DDL, Column, ForeignKey, Index, Integer, event, func, text
 
 class Wrestler(SQLModel, table=True):
     
+    __table_args__ = (
+        # Listado de activos paginado por id
+        Index("ix_wrestler_active_id", "active", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, nullable=False)
     ring_name: str = Field(index=True, nullable=False)
@@ -16,11 +22,49 @@ class Wrestler(SQLModel, table=True):
     image_url: Optional[str] = None 
     active: bool = Field(default=True)
     debut_date: Optional[date] = None
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
 
     stats: List["WrestlerStats"] = Relationship(back_populates="wrestler", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
 
+def search_vector():
+    """ tsvector de búsqueda: ring_name y name pesan más que ciudad y bio.
+
+    Es la misma expresión que indexa ix_wrestler_search, así que las consultas deben
+    usarla tal cual (con literales, no parámetros) para que PostgreSQL use el índice.
+    """
+    def weighted(column, weight):
+        document = func.coalesce(column, text("''"))
+        return func.setweight(func.to_tsvector(text("'simple'"), document), text(f"'{weight}'"))
+
+    return (
+        weighted(Wrestler.ring_name, "A")
+        .op("||")(weighted(Wrestler.name, "A"))
+        .op("||")(weighted(Wrestler.from_city, "B"))
+        .op("||")(weighted(Wrestler.bio, "C"))
+    )
+
+
+# Búsqueda de texto completo y por similitud (pg_trgm); solo en PostgreSQL
+Index("ix_wrestler_search", search_vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+Index(
+    "ix_wrestler_ring_name_trgm", Wrestler.ring_name,
+    postgresql_using="gin",
+    postgresql_ops={"ring_name": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_wrestler_name_trgm", Wrestler.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Wrestler.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+
 class WrestlerStats(SQLModel, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -31,7 +75,26 @@ class WrestlerStats(SQLModel, table=True):
     championships: int = Field(default=0)
     average_match_rating: float = Field(default=0.0)
     total_matches: int = Field(default=0)
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None, nullable=True)
+    rated_matches: int = Field(default=0) # luchas con al menos un rating
+    match_rating_sum: float = Field(default=0.0) # suma de los promedios de esas luchas
+    created_at: Optional[datetime] = Field(default_factory=utcnow)
+    updated_at: Optional[datetime] = Field(default=None, nullable=True, sa_column_kwargs={"onupdate": utcnow})
+
+    wrestler: Wrestler = Relationship(back_populates="stats", sa_relationship_kwargs={"cascade": "all, delete"})
+
+class WrestlerMatchResult(SQLModel, table=True):
+
+    # Resultado de cada luchador en cada lucha, alimentado por los eventos del servicio matches.
+    # La clave (wrestler_id, match_id) hace idempotente la aplicación de un mismo evento.
+    __tablename__: str = "wrestler_match_result"
+    __table_args__ = (
+        Index("ix_wrestler_match_result_match", "match_id"),
+    )
 
-    wrestler: Wrestler = Relationship(back_populates="stats", sa_relationship_kwargs={"cascade": "all, delete"})
\ No newline at end of file
+    wrestler_id: int = Field(sa_column=Column(Integer, ForeignKey("wrestler.id", ondelete="CASCADE"), primary_key=True))
+    match_id: int = Field(primary_key=True) # ID de la lucha del servicio matches
+    result: str = Field(nullable=False) # win, loss o draw
+    match_date: Optional[datetime] = None
+    match_rating: float = Field(default=0.0)
+    rating_count: int = Field(default=0)
+    rating_updated_at: Optional[datetime] = Field(default=None, nullable=True)
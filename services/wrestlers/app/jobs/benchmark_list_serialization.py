@@ -0,0 +1,79 @@
+""" Mide el serializado del listado de luchadores: camino normal frente a ?fast=true, en
+filas por segundo, y comprueba que ambos producen los mismos bytes.
+
+No usa la base de datos: genera filas sintéticas y reproduce el trabajo de la ruta
+después de la consulta. Normal: model_validate por fila, validación y serializado con
+el response_model de la ruta (serialize_response de FastAPI) y JSONResponse. Rápido:
+las tuplas que devuelve la consulta de columnas, codificadas por rows_response.
+
+Uso: python -m app.jobs.benchmark_list_serialization [--rows 100] [--repeat 200]
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api import wrestlers
+from app.core.fast_json import rows_response
+from app.db.models import Wrestler
+from app.schemas.wrestler import WrestlerRead
+
+
+def sample_rows(rows: int):
+    """ (modelos, tuplas) del listado; las tuplas llevan los tipos que da la consulta """
+    base = datetime(1985, 3, 31, 20, 0)
+    objects = [
+        Wrestler(
+            id=i, name=f"Óscar Gutiérrez {i}", ring_name=f"Rey Mysterio {i}", birth_date=date(1974, 12, 12),
+            height=167.6 + i % 3, weight=79.5, from_city="Chula Vista", bio="Master of the 619. " * 10,
+            image_url=f"https://img.example.com/wrestlers/{i}.jpg", active=bool(i % 2), debut_date=None if i % 4 else date(1989, 4, 30),
+            created_at=base + timedelta(days=i, microseconds=i * 1000), updated_at=base + timedelta(days=i + 1) if i % 3 else None
+        )
+        for i in range(1, rows + 1)
+    ]
+    fields = wrestlers.WRESTLER_READ_FIELDS
+    return objects, [tuple(getattr(obj, field) for field in fields) for obj in objects], fields
+
+
+async def normal_body(objects, route) -> bytes:
+    content = [WrestlerRead.model_validate(obj) for obj in objects]
+    value = await serialize_response(field=route.response_field, response_content=content)
+    return JSONResponse(content=value).body
+
+
+def fast_body(rows, fields) -> bytes:
+    response = Response()
+    # Como en FastAPI, la respuesta de las dependencias no lleva content-length
+    del response.headers["content-length"]
+    return rows_response(rows, fields, response).body
+
+
+async def benchmark(rows: int, repeat: int):
+    objects, tuples, fields = sample_rows(rows)
+    route = next(route for route in wrestlers.router.routes if getattr(route, "name", None) == "get_wrestlers")
+    same = await normal_body(objects, route) == fast_body(tuples, fields)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await normal_body(objects, route)
+    normal = rows * repeat / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fast_body(tuples, fields)
+    fast = rows * repeat / (time.perf_counter() - started)
+
+    print(f"{'listado':<10} {'filas':>6} {'normal filas/s':>15} {'fast filas/s':>13} {'x':>6}  bytes iguales")
+    print(f"{'wrestlers':<10} {rows:>6} {normal:>15,.0f} {fast:>13,.0f} {fast / normal:>6.1f}  {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="filas por página")
+    parser.add_argument("--repeat", type=int, default=200, help="páginas serializadas por camino")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.rows, args.repeat))
@@ -0,0 +1,58 @@
+""" Recalcula desde cero las estadísticas de todos los luchadores a partir del ledger
+wrestler_match_result. Para reconstruir también el ledger, ejecutar antes en el servicio
+matches: python -m app.jobs.republish_match_events
+
+Uso: python -m app.jobs.reconcile_stats
+"""
+
+from sqlalchemy import case
+from sqlmodel import Session, select, func
+
+from app.core.timestamps import utcnow
+from app.db.match_results import WIN, LOSS, DRAW
+from app.db.models import Wrestler, WrestlerStats, WrestlerMatchResult
+from app.db.session import sync_engine
+
+
+def reconcile_stats(db: Session) -> int:
+
+    rated = WrestlerMatchResult.rating_count > 0
+    statement = (
+        select(
+            WrestlerMatchResult.wrestler_id,
+            func.sum(case((WrestlerMatchResult.result == WIN, 1), else_=0)),
+            func.sum(case((WrestlerMatchResult.result == LOSS, 1), else_=0)),
+            func.sum(case((WrestlerMatchResult.result == DRAW, 1), else_=0)),
+            func.count(),
+            func.sum(case((rated, 1), else_=0)),
+            func.sum(case((rated, WrestlerMatchResult.match_rating), else_=0.0))
+        )
+        .group_by(WrestlerMatchResult.wrestler_id)
+    )
+    totals = {row[0]: row[1:] for row in db.exec(statement).all()}
+
+    existing = {stats.wrestler_id: stats for stats in db.exec(select(WrestlerStats)).all()}
+    now = utcnow()
+    wrestler_ids = db.exec(select(Wrestler.id)).all()
+    for wrestler_id in wrestler_ids:
+        wins, losses, draws, total, rated_matches, rating_sum = totals.get(wrestler_id, (0, 0, 0, 0, 0, 0.0))
+        stats = existing.get(wrestler_id) or WrestlerStats(wrestler_id=wrestler_id)
+
+        stats.wins = int(wins)
+        stats.losses = int(losses)
+        stats.draws = int(draws)
+        stats.total_matches = int(total)
+        stats.rated_matches = int(rated_matches)
+        stats.match_rating_sum = float(rating_sum)
+        stats.average_match_rating = stats.match_rating_sum / stats.rated_matches if stats.rated_matches else 0.0
+        stats.updated_at = now
+        db.add(stats)
+
+    db.commit()
+    return len(wrestler_ids)
+
+
+if __name__ == "__main__":
+    with Session(sync_engine) as session:
+        total = reconcile_stats(session)
+    print(f"Reconciled stats for {total} wrestlers")
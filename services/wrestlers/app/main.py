@@ -3,27 +3,37 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware 
 from fastapi.responses import JSONResponse
 import httpx 
-from sqlmodel import SQLModel, Session
 
 from app.api import wrestlers
 from app.core.config import settings 
-from app.db.session import engine, get_db 
+from app.core.jwt_verify import verifier, bearer_token, Principal, InvalidToken, KeysUnavailable
+from app.db.session import async_session, create_db_and_tables, engine
 
-from app.messaging.consumer import consume_messages
+from app.messaging.consumer import consume_messages, consume_match_events
 from contextlib import asynccontextmanager
 import threading
-from app.messaging.consumer import TOKEN_CACHE
-
-SQLModel.metadata.create_all(bind=engine)
+from app.core.token_cache import token_cache
+from app.core.autocomplete import ring_names
 
 def start_consumer():
     thread = threading.Thread(target=consume_messages, daemon=True)
     thread.start()
 
+    # Resultados y ratings de luchas publicados por el servicio matches
+    thread = threading.Thread(target=consume_match_events, daemon=True)
+    thread.start()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await create_db_and_tables()
+    # Tokens de logins anteriores al arranque (o recibidos por otros workers)
+    token_cache.warm()
+    # Índice del autocompletado cargado antes de la primera petición
+    async with async_session() as db:
+        await ring_names.ensure_loaded(db)
     start_consumer()
     yield
+    await engine.dispose()
 
 app = FastAPI(
     title="WWE Rankings Wrestlers Service", 
@@ -32,7 +42,7 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"], expose_headers=["X-Next-Cursor"])
 
 app.include_router(wrestlers.router, prefix="/wrestlers", tags=["wrestlers"])
 
@@ -42,6 +52,21 @@ def health_check():
     return {"status": "healthy", "service": "wrestlers"}
 
 
+@app.get("/health/jwks")
+async def jwks_stats():
+    return verifier.stats()
+
+
+@app.get("/health/token-cache")
+async def token_cache_stats():
+    return token_cache.stats()
+
+
+@app.get("/health/autocomplete")
+async def autocomplete_stats():
+    return ring_names.stats()
+
+
 @app.middleware("http")
 async def verify_token(request, call_next):
     
@@ -54,24 +79,22 @@ async def verify_token(request, call_next):
         response = await call_next(request)
         return response
     
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
+    token = bearer_token(request.headers.get("Authorization"))
+    if not token:
         return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Not authenticated"})
 
-    token = auth_header.split(" ")[1]
-    print(TOKEN_CACHE)
-    if not token in TOKEN_CACHE:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-
-    # Verificamos el token con el servicio de autenticación 
-    #try: 
-    #    async with httpx.AsyncClient() as client:
-    #        response = await client.get(f"{settings.AUTH_SERVICE_URL}/users/me", headers={"Authorization": auth_header})
-    #        
-    #        if response.status_code != 200:
-    #            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid token"})
-    #except httpx.RequestError:
-    #    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Auth Service unavailable"})
+    # Tokens de logins recientes (evento UserLoggedIn): sin verificar la firma de nuevo
+    email = token_cache.get(token)
+    if email is not None:
+        request.state.principal = Principal(email=email)
+    else:
+        # Tokens emitidos antes de arrancar el servicio: verificación local con las claves de auth
+        try:
+            request.state.principal = await verifier.verify(token)
+        except InvalidToken:
+            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid token"})
+        except KeysUnavailable:
+            return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Auth service unavailable"})
 
     response = await call_next(request)
     return response
@@ -1,22 +1,177 @@
+import hashlib
 import json 
-from pika import BlockingConnection, ConnectionParameters
+import logging
+import time
+from typing import Dict
+
+from pika import BasicProperties, BlockingConnection, ConnectionParameters
+from pika.exceptions import AMQPConnectionError
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.token_cache import token_cache
+from app.db.match_results import apply_match_events, parse_match_event
+from app.db.session import sync_engine
+
+logger = logging.getLogger(__name__)
+
+MATCH_EVENTS_QUEUE = 'match_events'
+
+# Errores de la base de datos que no dependen del mensaje (conexión caída, timeout):
+# el lote vuelve a la cola sin contar como intento fallido
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+# Mensajes distintos con intentos fallidos que se recuerdan a la vez
+FAILURES_MAX_SIZE = 10000
 
-TOKEN_CACHE = {}
 
 def consume_messages():
-    connection = BlockingConnection(ConnectionParameters(host='localhost', port=5672))
+    """ Consume auth_events y reintenta la conexión si RabbitMQ se cae """
+    while True:
+        try:
+            _consume_messages()
+        except AMQPConnectionError:
+            logger.warning("RabbitMQ unavailable, retrying in %ss", settings.MATCH_EVENTS_RETRY_DELAY)
+        except Exception:
+            # Sin este hilo los tokens de logins nuevos no llegarían a la caché
+            logger.exception("auth_events consumer failed, restarting in %ss", settings.MATCH_EVENTS_RETRY_DELAY)
+        time.sleep(settings.MATCH_EVENTS_RETRY_DELAY)
+
+
+def _consume_messages():
+    connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
     channel = connection.channel()
 
     channel.queue_declare(queue='auth_events')
 
-    def callback(ch, method, propierties, body):
-        
-        event = json.loads(body)
-        if event['event_name'] == 'UserLoggedIn':
-            
-            # Actualizamos el caché local con el nuevo token
-            TOKEN_CACHE[event['data']['token']] = event['data']['email']
-    
-    channel.basic_consume(queue='auth_events', on_message_callback=callback, auto_ack=True)
-    print(" [*] Waiting for messages. To exit press CTRL+C ")
-    channel.start_consuming()
\ No newline at end of file
+    # Sin mensajes durante TOKEN_CACHE_PURGE_INTERVAL aprovechamos para descartar tokens caducados
+    for method, _, body in channel.consume('auth_events', auto_ack=True, inactivity_timeout=settings.TOKEN_CACHE_PURGE_INTERVAL):
+        if method is None:
+            token_cache.purge()
+            continue
+
+        try:
+            event = json.loads(body)
+            if event['event_name'] == 'UserLoggedIn':
+                data = event['data']
+                token, email, expires_at = data['token'], data['email'], data.get('expires_at')
+                if not isinstance(token, str) or not isinstance(email, str):
+                    raise TypeError("token and email must be strings")
+                # Actualizamos el caché local con el nuevo token
+                token_cache.add(token, email, float(expires_at) if expires_at is not None else None)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Discarding malformed auth event: %r", body)
+
+
+def consume_match_events():
+    """ Consume match_events por lotes y reintenta la conexión si RabbitMQ se cae """
+    while True:
+        try:
+            _consume_match_events()
+        except AMQPConnectionError:
+            logger.warning("RabbitMQ unavailable, retrying in %ss", settings.MATCH_EVENTS_RETRY_DELAY)
+        except Exception:
+            # Cualquier otro error no debe matar el hilo: las estadísticas dejarían de actualizarse
+            logger.exception("match_events consumer failed, restarting in %ss", settings.MATCH_EVENTS_RETRY_DELAY)
+        time.sleep(settings.MATCH_EVENTS_RETRY_DELAY)
+
+
+def _apply(events):
+    with Session(sync_engine) as db:
+        apply_match_events(db, events)
+        db.commit()
+
+
+def _dead_letter(channel, body: bytes, reason: str):
+    """ Aparta un mensaje que no se puede aplicar en MATCH_EVENTS_DEAD_LETTER_QUEUE para revisarlo """
+    logger.error("Dead-lettering match event (%s): %r", reason, body)
+    channel.basic_publish(
+        exchange="",
+        routing_key=settings.MATCH_EVENTS_DEAD_LETTER_QUEUE,
+        body=body,
+        properties=BasicProperties(delivery_mode=2)
+    )
+
+
+def _process_batch(channel, batch, failures: Dict[str, int]):
+    """ Aplica un lote [(delivery_tag, body, (nombre, datos))] en una transacción.
+
+    Si falla por la base de datos (conexión, timeout) se devuelve entero a la cola. Si
+    falla por otra causa se aplica mensaje a mensaje: los que fallan se reintentan
+    hasta MATCH_EVENTS_MAX_ATTEMPTS veces y luego se apartan a la cola de fallidos,
+    para que un mensaje que falla siempre no bloquee la cola.
+    """
+    try:
+        _apply([event for _, _, event in batch])
+    except TRANSIENT_ERRORS:
+        logger.exception("Could not apply %s match events, requeueing", len(batch))
+        channel.basic_nack(delivery_tag=batch[-1][0], multiple=True, requeue=True)
+        time.sleep(settings.MATCH_EVENTS_RETRY_DELAY)
+        return
+    except Exception:
+        logger.exception("Could not apply %s match events, retrying one by one", len(batch))
+    else:
+        channel.basic_ack(delivery_tag=batch[-1][0], multiple=True)
+        return
+
+    for tag, body, event in batch:
+        digest = hashlib.sha1(body).hexdigest()
+        try:
+            _apply([event])
+        except TRANSIENT_ERRORS:
+            # Este y los que quedan del lote (los anteriores ya están confirmados)
+            logger.exception("Could not apply match event, requeueing")
+            channel.basic_nack(delivery_tag=batch[-1][0], multiple=True, requeue=True)
+            time.sleep(settings.MATCH_EVENTS_RETRY_DELAY)
+            return
+        except Exception:
+            failures[digest] = failures.get(digest, 0) + 1
+            if failures[digest] >= settings.MATCH_EVENTS_MAX_ATTEMPTS:
+                del failures[digest]
+                _dead_letter(channel, body, f"failed {settings.MATCH_EVENTS_MAX_ATTEMPTS} times")
+                channel.basic_ack(delivery_tag=tag)
+            else:
+                logger.exception("Could not apply match event (attempt %s), requeueing", failures[digest])
+                channel.basic_nack(delivery_tag=tag, requeue=True)
+        else:
+            failures.pop(digest, None)
+            channel.basic_ack(delivery_tag=tag)
+
+    # Los contadores solo sirven mientras el mensaje se reintenta
+    if len(failures) > FAILURES_MAX_SIZE:
+        failures.clear()
+
+
+def _consume_match_events():
+    connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
+    channel = connection.channel()
+
+    channel.queue_declare(queue=MATCH_EVENTS_QUEUE, durable=True)
+    channel.queue_declare(queue=settings.MATCH_EVENTS_DEAD_LETTER_QUEUE, durable=True)
+    channel.basic_qos(prefetch_count=settings.MATCH_EVENTS_BATCH_SIZE)
+
+    batch = []
+    failures: Dict[str, int] = {}
+    started = None
+
+    # Con inactivity_timeout el generador devuelve (None, None, None) cuando no llegan
+    # mensajes, lo que permite cerrar lotes incompletos
+    for method, _, body in channel.consume(MATCH_EVENTS_QUEUE, inactivity_timeout=settings.MATCH_EVENTS_BATCH_WAIT):
+        if method is not None:
+            started = started or time.monotonic()
+            try:
+                batch.append((method.delivery_tag, body, parse_match_event(body)))
+            except ValueError as error:
+                # Un mensaje mal formado no debe bloquear la cola ni hacer fallar el lote
+                _dead_letter(channel, body, f"malformed: {error}")
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+
+            full = len(batch) >= settings.MATCH_EVENTS_BATCH_SIZE
+            if not full and time.monotonic() - started < settings.MATCH_EVENTS_BATCH_WAIT:
+                continue
+
+        if batch:
+            _process_batch(channel, batch, failures)
+
+        batch = []
+        started = None
@@ -0,0 +1,33 @@
+import json
+import logging
+
+from pika import BlockingConnection, ConnectionParameters
+from pika.exceptions import AMQPError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CATALOG_EXCHANGE = 'catalog_events'
+
+
+def publish_event(event_name: str, data: dict):
+    """ Publica un cambio del catálogo de luchadores (fanout, p. ej. para invalidar cachés).
+
+    Pensado para BackgroundTasks: si RabbitMQ no está disponible solo se registra el error.
+    """
+    try:
+        connection = BlockingConnection(ConnectionParameters(host=settings.RABBITMQ_HOST, port=settings.RABBITMQ_PORT))
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(exchange=CATALOG_EXCHANGE, exchange_type='fanout')
+
+            event = {
+                "event_name": event_name,
+                "data": data
+            }
+            channel.basic_publish(exchange=CATALOG_EXCHANGE, routing_key='', body=json.dumps(event))
+        finally:
+            connection.close()
+    except AMQPError:
+        logger.exception("Could not publish %s", event_name)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any 
+from typing import Optional, Dict, Any, List
 from datetime import date, datetime
 
 class WrestlerBase(BaseModel):
@@ -38,6 +38,11 @@ class WrestlerRead(WrestlerBase):
         from_attributes = True
 
 
+class WrestlerSuggestion(BaseModel):
+    id: int
+    ring_name: str
+
+
 class WrestlerStatsBase(BaseModel):
     wins: int = 0
     losses: int = 0
@@ -56,4 +61,8 @@ class WrestlerStats(WrestlerStatsBase):
         orm_mode = True 
         
 class WrestlerWithStats(WrestlerRead):
-    stats: Optional[WrestlerStats] = None
\ No newline at end of file
+    stats: Optional[WrestlerStats] = None
+
+class WrestlerBatch(BaseModel):
+    wrestlers: List[WrestlerWithStats]
+    missing: List[int] = []
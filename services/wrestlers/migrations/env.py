@@ -21,7 +21,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from app.db.models import Wrestler, WrestlerStats
+from app.db.models import Wrestler, WrestlerStats, WrestlerMatchResult
 
 from sqlmodel import SQLModel
 
@@ -0,0 +1,46 @@
+"""wrestler search indexes
+
+Revision ID: e7b3f19c6d42
+Revises: c4d7e9a2b158
+Create Date: 2025-06-10 16:24:51.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f19c6d42'
+down_revision: Union[str, None] = 'c4d7e9a2b158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Debe coincidir con app.db.models.search_vector para que las consultas usen el índice
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(ring_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(from_city, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(bio, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_wrestler_search', 'wrestler', [sa.text(f'({SEARCH_VECTOR})')], unique=False, postgresql_using='gin')
+    op.create_index('ix_wrestler_ring_name_trgm', 'wrestler', ['ring_name'], unique=False, postgresql_using='gin', postgresql_ops={'ring_name': 'gin_trgm_ops'})
+    op.create_index('ix_wrestler_name_trgm', 'wrestler', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_wrestler_name_trgm', table_name='wrestler', postgresql_using='gin')
+    op.drop_index('ix_wrestler_ring_name_trgm', table_name='wrestler', postgresql_using='gin')
+    op.drop_index('ix_wrestler_search', table_name='wrestler', postgresql_using='gin')